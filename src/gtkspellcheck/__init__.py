@@ -52,9 +52,38 @@ __metadata__ = {
     "__desc_long__": __desc_long__,
 }
 
-from gtkspellcheck.spellcheck import (
-    SpellChecker,
-    NoDictionariesFound,
-)
+import importlib
 
-__all__ = ["SpellChecker", "NoDictionariesFound"]
+# public objects and the modules providing them, the modules are imported lazily
+# such that the headless engine can be used without GTK
+_LAZY_OBJECTS = {
+    "SpellChecker": "gtkspellcheck.spellcheck",
+    "NoDictionariesFound": "gtkspellcheck.spellcheck",
+    "PangoTokenizer": "gtkspellcheck.spellcheck",
+    "SpellingEngine": "gtkspellcheck.engine",
+    "RegexTokenizer": "gtkspellcheck.engine",
+}
+
+__all__ = [
+    "SpellChecker",
+    "NoDictionariesFound",
+    "PangoTokenizer",
+    "SpellingEngine",
+    "RegexTokenizer",
+]
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_OBJECTS[name]
+    except KeyError:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        ) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_OBJECTS))
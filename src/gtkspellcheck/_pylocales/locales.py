@@ -23,19 +23,17 @@ This package provides translation for country and language names if the
 iso-code messages are installed on your system.
 """
 
+import functools
 import gettext
 import logging
 import os
 import sqlite3
 import sys
+import threading
 
 # public objects
 __all__ = ["Country", "Language", "LanguageNotFound", "CountryNotFound", "code_to_name"]
 
-# translation
-_translator_language = gettext.translation("iso_639", fallback=True).gettext
-_translator_country = gettext.translation("iso_3166", fallback=True).gettext
-
 # Decides where the database is located. If an application provides an
 # os.path.get_module_path monkey patch to determine the path where the module
 # is located it uses this. If not it searches in the directory of this source
@@ -58,9 +56,6 @@ if __path__ is None:
         __path__ = os.path.abspath(os.path.realpath(os.path.dirname(__file__)))
 
 
-# loading the database
-_database = sqlite3.connect(os.path.join(__path__, "locales.db"))
-
 logger = logging.getLogger(__name__)
 
 
@@ -76,26 +71,76 @@ class CountryNotFound(Exception):
     """
 
 
-class Country(object):
-    def __init__(self, rowid):
-        country = _database.execute(
-            "SELECT * FROM countries WHERE rowid == ?", (rowid,)
-        ).fetchone()
-        self.name = country[0]
-        self.official_name = country[1]
-        self.alpha_2 = country[2]
-        self.alpha_3 = country[3]
-        self.numeric = country[4]
-        self.translation = _translator_country(self.name)
+@functools.lru_cache(maxsize=None)
+def _catalog(domain):
+    # the catalogs are loaded when the first name is translated
+    return gettext.translation(domain, fallback=True).gettext
+
+
+@functools.lru_cache(maxsize=None)
+def _translate_language(name):
+    return _catalog("iso_639")(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _translate_country(name):
+    return _catalog("iso_3166")(name)
+
+
+class _Record(object):
+    # immutable record of a row of the database, there is exactly one instance
+    # per row which is returned by all lookups
+    __slots__ = ()
+
+    _fields = ()
+
+    def __new__(cls, rowid):
+        try:
+            return _get_tables().records[cls][rowid]
+        except KeyError:
+            raise cls._not_found("rowid: {}".format(rowid)) from None
+
+    @classmethod
+    def _create(cls, row):
+        record = object.__new__(cls)
+        for field, value in zip(cls._fields, row):
+            object.__setattr__(record, field, value)
+        return record
+
+    @classmethod
+    def _lookup(cls, code, codec):
+        try:
+            index = _get_tables().indexes[cls][codec]
+        except KeyError:
+            raise ValueError("unknown codec: {}".format(codec)) from None
+        try:
+            return index[code]
+        except KeyError:
+            raise cls._not_found("code: %s, codec: %s" % (code, codec)) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
+    def __repr__(self):
+        return "<{} {!r}>".format(type(self).__name__, self.name)
+
+
+class Country(_Record):
+    __slots__ = ("name", "official_name", "alpha_2", "alpha_3", "numeric")
+
+    _fields = __slots__
+    _not_found = CountryNotFound
+
+    @property
+    def translation(self):
+        return _translate_country(self.name)
 
     @classmethod
     def get_country(cls, code, codec):
-        country = _database.execute(
-            "SELECT rowid FROM countries WHERE %s == ?" % (codec), (code,)
-        ).fetchone()
-        if country:
-            return cls(country[0])
-        raise CountryNotFound("code: %s, codec: %s" % (code, codec))
+        return cls._lookup(code, codec)
 
     @classmethod
     def by_alpha_2(cls, code):
@@ -110,25 +155,19 @@ class Country(object):
         return Country.get_country(code, "numeric")
 
 
-class Language(object):
-    def __init__(self, rowid):
-        language = _database.execute(
-            "SELECT * FROM languages WHERE rowid == ?", (rowid,)
-        ).fetchone()
-        self.name = language[0]
-        self.iso_639_2B = language[1]
-        self.iso_639_2T = language[2]
-        self.iso_639_1 = language[3]
-        self.translation = _translator_language(self.name)
+class Language(_Record):
+    __slots__ = ("name", "iso_639_2B", "iso_639_2T", "iso_639_1")
+
+    _fields = __slots__
+    _not_found = LanguageNotFound
+
+    @property
+    def translation(self):
+        return _translate_language(self.name)
 
     @classmethod
     def get_language(cls, code, codec):
-        language = _database.execute(
-            "SELECT rowid FROM languages WHERE %s == ?" % (codec), (code,)
-        ).fetchone()
-        if language:
-            return cls(language[0])
-        raise LanguageNotFound("code: %s, codec: %s" % (code, codec))
+        return cls._lookup(code, codec)
 
     @classmethod
     def by_iso_639_2b(cls, code):
@@ -143,6 +182,46 @@ class Language(object):
         return Language.get_language(code, "iso_639_1")
 
 
+class _Tables(object):
+    # the whole database loaded into dictionaries indexed by every codec
+    def __init__(self, path):
+        self.records = {}
+        self.indexes = {}
+        database = sqlite3.connect(path)
+        try:
+            for cls, table in ((Country, "countries"), (Language, "languages")):
+                rows = database.execute(
+                    "SELECT rowid, {} FROM {} ORDER BY rowid".format(
+                        ", ".join(cls._fields), table
+                    )
+                ).fetchall()
+                records = {row[0]: cls._create(row[1:]) for row in rows}
+                indexes = {codec: {} for codec in cls._fields[1:]}
+                for record in records.values():
+                    for codec, index in indexes.items():
+                        code = getattr(record, codec)
+                        # the first row wins like with the former SQL queries
+                        if code is not None and code not in index:
+                            index[code] = record
+                self.records[cls] = records
+                self.indexes[cls] = indexes
+        finally:
+            database.close()
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                _tables = _Tables(os.path.join(__path__, "locales.db"))
+    return _tables
+
+
 def code_to_name(code, separator="_"):
     """
     Get the human readable and translated name of a language based on it's code.
@@ -0,0 +1,104 @@
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Counters and timing histograms collected by the spellchecking components if
+statistics are enabled.
+"""
+
+import bisect
+import threading
+
+__all__ = ["Statistics"]
+
+# upper bounds in microseconds of the histogram buckets, the last bucket is open
+_BUCKETS = tuple(2**exponent for exponent in range(21))
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(_BUCKETS) + 1)
+
+
+class Statistics:
+    """
+    Thread-safe collection of named counters and timing histograms. Histogram
+    buckets are bounded by powers of two of microseconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+
+    def count(self, name, value=1):
+        """
+        Add `value` to the counter `name`.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record(self, name, seconds):
+        """
+        Add a duration in seconds to the timing histogram `name`.
+        """
+        index = bisect.bisect_left(_BUCKETS, seconds * 1e6)
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing()
+            timing.count += 1
+            timing.total += seconds
+            timing.max = max(timing.max, seconds)
+            timing.buckets[index] += 1
+
+    def reset(self):
+        """
+        Reset all counters and histograms.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def snapshot(self):
+        """
+        Return a dictionary with the counters and, for every timing histogram,
+        the number of durations, their total and maximum in milliseconds and the
+        histogram mapping the upper bounds of the buckets in microseconds to the
+        number of durations, where `None` is the open last bucket.
+        """
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                bounds = _BUCKETS + (None,)
+                timings[name] = {
+                    "count": timing.count,
+                    "total_ms": timing.total * 1000,
+                    "max_ms": timing.max * 1000,
+                    "histogram": {
+                        bound: count
+                        for bound, count in zip(bounds, timing.buckets)
+                        if count
+                    },
+                }
+            return {"counters": dict(self._counters), "timings": timings}
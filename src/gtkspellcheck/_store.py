@@ -0,0 +1,380 @@
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent store of dictionary verdicts surviving the process.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+
+__all__ = ["VerdictStore", "dictionary_identity"]
+
+# logger
+logger = logging.getLogger(__name__)
+
+# incremented whenever the schema changes, older databases are recreated
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY,
+    provider TEXT NOT NULL,
+    language TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    pwl_size INTEGER NOT NULL,
+    pwl_mtime INTEGER NOT NULL,
+    exc_size INTEGER NOT NULL,
+    exc_mtime INTEGER NOT NULL,
+    UNIQUE (provider, language, fingerprint)
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    dictionary INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (dictionary, word)
+) WITHOUT ROWID;
+"""
+
+_DICTIONARY_EXTENSIONS = (".dic", ".aff", ".multi", ".rws")
+
+
+def _config_dirs():
+    # the directories Enchant 1 and 2 read the personal word lists and the
+    # user's dictionaries from
+    directories = []
+    if os.environ.get("ENCHANT_CONFIG_DIR"):
+        directories.append(os.environ["ENCHANT_CONFIG_DIR"])
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+        os.path.expanduser("~"), ".config"
+    )
+    directories.append(os.path.join(config_home, "enchant"))
+    directories.append(os.path.join(os.path.expanduser("~"), ".enchant"))
+    return directories
+
+
+def _dictionary_dirs(provider, params):
+    directories = [
+        value for param, value in params.items() if param.endswith(".dictionary.path")
+    ]
+    directories.extend(os.path.join(path, provider) for path in _config_dirs())
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    for data_dir in data_dirs.split(os.pathsep):
+        directories.extend(
+            os.path.join(data_dir, name)
+            for name in ("hunspell", "myspell", "myspell/dicts", "enchant/" + provider)
+        )
+    return directories
+
+
+def _file_version(path):
+    try:
+        result = os.stat(path)
+    except OSError:
+        return 0, 0
+    return result.st_size, result.st_mtime_ns
+
+
+def dictionary_identity(dictionary, params=None):
+    """
+    Returns the provider, the language, a fingerprint of the dictionary files
+    and the sizes and modification times of the personal word list and its
+    exclusions. The fingerprint is `None` if the files of the dictionary could
+    not be found, such that changes could not be detected.
+
+    :param dictionary: The Enchant dictionary.
+    :param params: Dictionary with the Enchant broker parameters.
+    """
+    provider = dictionary.provider
+    language = dictionary.tag
+    files = []
+    for directory in _dictionary_dirs(provider.name, params or {}):
+        for extension in _DICTIONARY_EXTENSIONS:
+            path = os.path.join(directory, language + extension)
+            if os.path.isfile(path):
+                files.append((path,) + _file_version(path))
+    fingerprint = None
+    if files:
+        files.append((provider.file,) + _file_version(provider.file))
+        fingerprint = hashlib.sha1(repr(files).encode("utf-8")).hexdigest()
+    pwl = exc = (0, 0)
+    for directory in _config_dirs():
+        if os.path.isfile(os.path.join(directory, language + ".dic")):
+            pwl = _file_version(os.path.join(directory, language + ".dic"))
+            exc = _file_version(os.path.join(directory, language + ".exc"))
+            break
+    return provider.name, language, fingerprint, pwl + exc
+
+
+class VerdictStore:
+    """
+    Persistent store of the verdicts of words in an SQLite database, allowing
+    a new process to skip Enchant for words checked before. Verdicts are kept
+    per provider, language and fingerprint of the dictionary files, such that
+    updated dictionaries invalidate them. Growing personal word lists only
+    invalidate the verdicts of misspelled words, any other change of the
+    personal word list invalidates all verdicts of the dictionary.
+
+    Verdicts are looked up in the database one by one, only for words missing
+    from the in-memory verdict cache, such that the store does not hold them in
+    memory. New verdicts are written in batches, when the store is flushed or
+    closed and when the process exits. The store is thread-safe and may be
+    shared by several :class:`gtkspellcheck.SpellChecker` instances.
+
+    :param path: Path of the database file, it is created if necessary.
+    :param batch_size: Number of new verdicts after which they are written.
+    """
+
+    def __init__(self, path, batch_size=1000):
+        self._path = path
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        # dictionary ids per cache key of the engines
+        self._ids = {}
+        # cache keys of dictionaries with session words, only the verdicts of
+        # misspelled words are independent of the session
+        self._sessions = set()
+        # verdicts not written yet by dictionary id and word
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self._connection = self._connect()
+        # pending verdicts are written when the process exits
+        self._finalizer = weakref.finalize(
+            self, VerdictStore._close, self._connection, self._pending
+        )
+
+    def _connect(self):
+        try:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                with connection:
+                    connection.execute("DROP TABLE IF EXISTS verdicts")
+                    connection.execute("DROP TABLE IF EXISTS dictionaries")
+                    connection.execute(
+                        "PRAGMA user_version = {}".format(_SCHEMA_VERSION)
+                    )
+            connection.executescript(_SCHEMA)
+            return connection
+        except sqlite3.Error as e:
+            logger.warning("failure opening verdict store: {}".format(e))
+            return None
+
+    @property
+    def path(self):
+        """
+        The path of the database file.
+        """
+        return self._path
+
+    def register(self, cache_key, dictionary, params=None):
+        """
+        Associate the cache key of engines with a dictionary. Dictionaries whose
+        files could not be found are not stored.
+
+        :param cache_key: The engines' identity of the dictionary.
+        :param dictionary: The Enchant dictionary.
+        :param params: Dictionary with the Enchant broker parameters.
+        """
+        with self._lock:
+            if cache_key in self._ids or self._connection is None:
+                return
+        provider, language, fingerprint, pwl = dictionary_identity(dictionary, params)
+        if fingerprint is None:
+            logger.debug("Not storing verdicts of %s, no files found.", language)
+            return
+        with self._lock:
+            try:
+                with self._connection:
+                    dictionary_id = self._open_dictionary(
+                        provider, language, fingerprint, pwl
+                    )
+            except sqlite3.Error as e:
+                logger.warning("failure registering dictionary: {}".format(e))
+                return
+            self._ids[cache_key] = dictionary_id
+
+    def _open_dictionary(self, provider, language, fingerprint, pwl):
+        # returns the id of the dictionary, the verdicts of outdated versions of
+        # the dictionary are dropped
+        execute = self._connection.execute
+        stale = "SELECT id FROM dictionaries WHERE provider = ? AND language = ?"
+        stale += " AND fingerprint != ?"
+        execute(
+            "DELETE FROM verdicts WHERE dictionary IN ({})".format(stale),
+            (provider, language, fingerprint),
+        )
+        execute(
+            "DELETE FROM dictionaries WHERE id IN ({})".format(stale),
+            (provider, language, fingerprint),
+        )
+        row = execute(
+            "SELECT id, pwl_size, pwl_mtime, exc_size, exc_mtime FROM dictionaries"
+            " WHERE provider = ? AND language = ? AND fingerprint = ?",
+            (provider, language, fingerprint),
+        ).fetchone()
+        if row is None:
+            return execute(
+                "INSERT INTO dictionaries (provider, language, fingerprint, pwl_size,"
+                " pwl_mtime, exc_size, exc_mtime) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (provider, language, fingerprint) + pwl,
+            ).lastrowid
+        dictionary_id, stored = row[0], row[1:]
+        if stored != pwl:
+            if pwl[0] > stored[0] and pwl[2:] == stored[2:]:
+                # words have been appended to the personal word list
+                execute(
+                    "DELETE FROM verdicts WHERE dictionary = ? AND correct = 0",
+                    (dictionary_id,),
+                )
+            else:
+                # words may have been removed from or replaced in the personal
+                # word list or excluded
+                execute("DELETE FROM verdicts WHERE dictionary = ?", (dictionary_id,))
+            execute(
+                "UPDATE dictionaries SET pwl_size = ?, pwl_mtime = ?, exc_size = ?,"
+                " exc_mtime = ? WHERE id = ?",
+                pwl + (dictionary_id,),
+            )
+        return dictionary_id
+
+    def get(self, cache_key, word):
+        """
+        Returns the stored verdict of the word or `None`.
+        """
+        with self._lock:
+            dictionary_id = self._ids.get(cache_key)
+            if dictionary_id is None:
+                return None
+            correct = self._pending.get((dictionary_id, word))
+            if correct is None:
+                try:
+                    row = self._connection.execute(
+                        "SELECT correct FROM verdicts WHERE dictionary = ? AND word = ?",
+                        (dictionary_id, word),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning("failure loading verdict: {}".format(e))
+                    row = None
+                if row is not None:
+                    correct = bool(row[0])
+            if correct is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return correct
+
+    def put(self, cache_key, word, correct):
+        """
+        Store the verdict of the word, it is written with the next batch.
+        """
+        with self._lock:
+            dictionary_id = self._ids.get(cache_key)
+            if dictionary_id is None or (correct and cache_key in self._sessions):
+                return
+            self._pending[(dictionary_id, word)] = correct
+            if len(self._pending) >= self._batch_size:
+                self._write()
+
+    def discard(self, cache_key, word):
+        """
+        Remove the verdict of the word, e.g., because a related word has been
+        added to the personal word list.
+        """
+        with self._lock:
+            dictionary_id = self._ids.get(cache_key)
+            if dictionary_id is None:
+                return
+            self._pending.pop((dictionary_id, word), None)
+            try:
+                with self._connection:
+                    self._connection.execute(
+                        "DELETE FROM verdicts WHERE dictionary = ? AND word = ?",
+                        (dictionary_id, word),
+                    )
+            except sqlite3.Error as e:
+                logger.warning("failure removing verdict: {}".format(e))
+
+    def begin_session(self, cache_key):
+        """
+        Stop storing verdicts of correct words of the dictionary for the rest
+        of the process because words have been added to its session.
+        """
+        with self._lock:
+            self._sessions.add(cache_key)
+
+    def flush(self):
+        """
+        Write all pending verdicts.
+        """
+        with self._lock:
+            self._write()
+
+    def close(self):
+        """
+        Write all pending verdicts and close the database.
+        """
+        with self._lock:
+            self._write()
+            self._ids.clear()
+            self._finalizer()
+            self._connection = None
+
+    def stats(self):
+        """
+        Returns the number of hits and misses and the number of verdicts not
+        written yet.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "pending": len(self._pending),
+            }
+
+    def _write(self):
+        VerdictStore._write_pending(self._connection, self._pending)
+
+    @staticmethod
+    def _write_pending(connection, pending):
+        if not pending or connection is None:
+            return
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO verdicts (dictionary, word, correct)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        (dictionary_id, word, int(correct))
+                        for (dictionary_id, word), correct in pending.items()
+                    ),
+                )
+        except sqlite3.Error as e:
+            logger.warning("failure writing verdicts: {}".format(e))
+        pending.clear()
+
+    @staticmethod
+    def _close(connection, pending):
+        if connection is not None:
+            VerdictStore._write_pending(connection, pending)
+            connection.close()
@@ -0,0 +1,1210 @@
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Toolkit independent spellchecking of plain strings. The engine implements the
+tokenization, filtering and checking logic used by the GTK `SpellChecker` and
+can be used on its own without a display, e.g., on a server.
+"""
+
+import array
+import bisect
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from ._cache import LRUCache
+from ._store import VerdictStore
+
+# public objects
+__all__ = [
+    "SpellingEngine",
+    "IntervalIndex",
+    "SpanIndex",
+    "Tokenizer",
+    "RegexTokenizer",
+    "DictionaryPool",
+    "VerdictStore",
+    "verdict_cache",
+    "suggestion_cache",
+    "paragraph_cache",
+    "dictionary_pool",
+]
+
+# logger
+logger = logging.getLogger(__name__)
+
+_VERDICT_CACHE_SIZE = 50000
+
+_SUGGESTION_CACHE_SIZE = 1000
+
+# process-wide caches of dictionary verdicts and suggestions shared by all engines
+verdict_cache = LRUCache(_VERDICT_CACHE_SIZE)
+suggestion_cache = LRUCache(_SUGGESTION_CACHE_SIZE)
+
+_PARAGRAPH_CACHE_SIZE = 20000
+
+# process-wide cache of the results of checked paragraphs, i.e., lines, keyed by
+# a digest of their text and everything else the result depends on
+paragraph_cache = LRUCache(_PARAGRAPH_CACHE_SIZE)
+
+# incremented per dictionary whenever words are accepted or forgotten, such
+# that cached paragraph results of the dictionary become outdated
+_dictionary_generations = {}
+
+_COMPILED_REGEX_CACHE_SIZE = 128
+
+_compiled_regexes = LRUCache(_COMPILED_REGEX_CACHE_SIZE)
+
+
+def enchant():
+    """
+    Return the :mod:`enchant` module, importing it on first use because loading
+    it locates and loads the native Enchant library.
+    """
+    import enchant
+
+    return enchant
+
+
+def _compile(pattern, flags=0):
+    # compiled word and filter regexes are shared between all engines, unlike the
+    # cache of `re` this one is not flushed by unrelated regexes of the application
+    key = (pattern, flags)
+    regex = _compiled_regexes.get(key)
+    if regex is None:
+        regex = re.compile(pattern, flags)
+        _compiled_regexes.put(key, regex)
+    return regex
+
+
+# letters and digits, including combining diacritical marks, but no underscores
+_WORD_CHARS = r"(?:[^\W_]|[\u0300-\u036f])"
+
+
+class IntervalIndex:
+    """
+    Sorted index of non-overlapping, half-open `(start, end)` spans, e.g., of
+    filter matches, supporting lookups in logarithmic time. The lookups also
+    return spans merely touching the offset or range, such that a word starting
+    right at the end of a filter match is covered by it.
+
+    Shifting the spans after an edit is deferred: the spans from an index on
+    are stored without the pending delta, which is only applied to the spans
+    between consecutive edits. Edits close to each other, e.g., typing, hence
+    take logarithmic time like lookups.
+
+    :param spans: Sorted, non-overlapping spans.
+    """
+
+    def __init__(self, spans=()):
+        spans = list(spans)
+        self._starts = self._offsets(start for start, _end in spans)
+        self._ends = self._offsets(end for _start, end in spans)
+        # the delta still to be added to the spans from this index on
+        self._split = len(spans)
+        self._delta = 0
+
+    @staticmethod
+    def _offsets(offsets):
+        return list(offsets)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(self._spans(0, len(self._starts)))
+
+    def _bisect(self, offsets, offset, right=False):
+        # bisects the offsets as if the pending delta had been applied, the
+        # offsets before and after the split are sorted on their own
+        search = bisect.bisect_right if right else bisect.bisect_left
+        split = self._split
+        index = search(offsets, offset, 0, split)
+        if index < split:
+            return index
+        return search(offsets, offset - self._delta, split, len(offsets))
+
+    def _span(self, index):
+        delta = self._delta if index >= self._split else 0
+        return self._starts[index] + delta, self._ends[index] + delta
+
+    def _spans(self, first, last):
+        return [self._span(index) for index in range(first, last)]
+
+    def _settle(self, index):
+        # moves the split to the index, applying or removing the delta of the
+        # spans in between
+        split = self._split
+        delta = self._delta
+        if index > split:
+            first, last = split, index
+        else:
+            first, last, delta = index, split, -delta
+        if delta:
+            for offsets in (self._starts, self._ends):
+                offsets[first:last] = self._offsets(
+                    offset + delta for offset in offsets[first:last]
+                )
+        self._split = index
+        if index == len(self._starts):
+            self._delta = 0
+
+    def _assign(self, first, last, spans):
+        # replaces the spans from the first to the last index by the spans
+        self._settle(last)
+        self._starts[first:last] = self._offsets(start for start, _end in spans)
+        self._ends[first:last] = self._offsets(end for _start, end in spans)
+        self._split = first + len(spans)
+        if self._split == len(self._starts):
+            self._delta = 0
+
+    def covering(self, offset):
+        """
+        Returns the first span with `start <= offset <= end` or `None`.
+        """
+        index = self._bisect(self._ends, offset)
+        if index < len(self._starts):
+            span = self._span(index)
+            if span[0] <= offset:
+                return span
+        return None
+
+    def previous(self, offset):
+        """
+        Returns the last span ending at or before `offset` or `None`.
+        """
+        index = self._bisect(self._ends, offset, right=True) - 1
+        if index >= 0:
+            return self._span(index)
+        return None
+
+    def extent(self, start, end):
+        """
+        Extends the range such that it includes all spans overlapping it.
+        """
+        first = self._bisect(self._ends, start)
+        last = self._bisect(self._starts, end, right=True)
+        if first < last:
+            start = min(start, self._span(first)[0])
+            end = max(end, self._span(last - 1)[1])
+        return start, end
+
+    def slice(self, start, end):
+        """
+        Returns a new index with the spans overlapping the range, relative to
+        the start of the range.
+        """
+        first = self._bisect(self._ends, start)
+        last = self._bisect(self._starts, end, right=True)
+        return IntervalIndex(
+            (span_start - start, span_end - start)
+            for span_start, span_end in self._spans(first, last)
+        )
+
+    def replace(self, start, end, spans):
+        """
+        Replaces the spans overlapping the range, or overlapping any of the new
+        spans, by the new sorted spans. Spans merely touching them are kept.
+        """
+        spans = list(spans)
+        if spans:
+            start = min(start, spans[0][0])
+            end = max(end, spans[-1][1])
+        first = self._bisect(self._ends, start, right=True)
+        last = self._bisect(self._starts, end)
+        self._assign(first, last, spans)
+
+    def shift(self, offset, delta):
+        """
+        Moves the spans after an insertion of `delta` characters at `offset` or,
+        if `delta` is negative, a deletion of `-delta` characters at `offset`.
+        Spans the insertion is strictly within are extended, spans ending at the
+        insertion are not. Spans within the deletion are removed and returned.
+        """
+        first = self._bisect(self._ends, offset, right=True)
+        if delta >= 0:
+            last = first
+            if first < len(self._starts) and self._span(first)[0] < offset:
+                last += 1
+
+            def move(position):
+                return position + delta if position >= offset else position
+
+        else:
+            last = self._bisect(self._starts, offset - delta)
+
+            def move(position):
+                if position < offset:
+                    return position
+                return max(position + delta, offset)
+
+        # only the spans overlapping the edit are moved right away, the ones
+        # after it are moved by the pending delta
+        spans = []
+        removed = []
+        for span in self._spans(first, last):
+            span_start, span_end = move(span[0]), move(span[1])
+            if span_start < span_end:
+                spans.append((span_start, span_end))
+            else:
+                removed.append(span)
+        self._assign(first, last, spans)
+        if self._split < len(self._starts):
+            self._delta += delta
+        return removed
+
+
+class SpanIndex(IntervalIndex):
+    """
+    :class:`IntervalIndex` of misspelled words stored compactly as arrays of
+    offsets. Unlike the lookups of :class:`IntervalIndex`, the ones below do not
+    consider spans merely touching the offset or range.
+    """
+
+    @staticmethod
+    def _offsets(offsets):
+        return array.array("q", offsets)
+
+    def at(self, offset):
+        """
+        Returns the span containing the offset, else the span ending at it, or
+        `None`.
+        """
+        index = self._bisect(self._ends, offset, right=True)
+        if index < len(self._starts):
+            span = self._span(index)
+            if span[0] <= offset:
+                return span
+        if index > 0:
+            span = self._span(index - 1)
+            if span[1] == offset:
+                return span
+        return None
+
+    def next(self, offset):
+        """
+        Returns the first span starting at or after `offset` or `None`.
+        """
+        index = self._bisect(self._starts, offset)
+        if index < len(self._starts):
+            return self._span(index)
+        return None
+
+    def spans(self, start, end):
+        """
+        Returns the spans overlapping the range from `start` to `end`.
+        """
+        first = self._bisect(self._ends, start, right=True)
+        last = self._bisect(self._starts, end)
+        return self._spans(first, last)
+
+    def replace(self, start, end, spans):
+        """
+        Makes the sorted spans the only spans within the range, spans reaching
+        beyond the range are cut at its boundaries. Returns the spans which have
+        been removed and the spans which have been added.
+        """
+        first = self._bisect(self._ends, start, right=True)
+        last = self._bisect(self._starts, end)
+        old = self._spans(first, last)
+        new = list(spans)
+        if old and old[0][0] < start:
+            new.insert(0, (old[0][0], start))
+        if old and old[-1][1] > end:
+            new.append((end, old[-1][1]))
+        if old == new:
+            return [], []
+        self._assign(first, last, new)
+        old_spans = set(old)
+        new_spans = set(new)
+        return (
+            [span for span in old if span not in new_spans],
+            [span for span in new if span not in old_spans],
+        )
+
+
+def _split_identifier(text, start, end):
+    # splits camelCase and PascalCase words where the case changes, e.g.,
+    # "parseHTTPHeader" into "parse", "HTTP" and "Header"
+    part_start = start
+    for index in range(start + 1, end):
+        if not text[index].isupper():
+            continue
+        previous = text[index - 1]
+        if (
+            previous.islower()
+            or previous.isdigit()
+            or (previous.isupper() and index + 1 < end and text[index + 1].islower())
+        ):
+            yield part_start, index
+            part_start = index
+    yield part_start, end
+
+
+class Tokenizer:
+    """
+    Interface of tokenizers splitting plain text into words.
+
+    .. attribute:: thread_safe
+
+        Whether :meth:`tokenize` may be called from worker threads.
+    """
+
+    thread_safe = True
+
+    @property
+    def cache_key(self):
+        """
+        Hashable value under which results depending on the tokenization are
+        cached. Tokenizers with equal keys have to split texts alike. Defaults
+        to the tokenizer itself.
+        """
+        return self
+
+    def tokenize(self, text):
+        """
+        Iterates over the `(start, end)` spans of the words of the text.
+        """
+        raise NotImplementedError()
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Tokenizer based on a compiled regular expression. Words are runs of letters,
+    digits and combining marks which may be joined, preceded and followed by
+    extra characters. The cost is linear in the length of the text.
+
+    :param extra_chars: Extra characters beyond which words are extended.
+    :param language: Language code whose extra characters listed in
+        :attr:`LANGUAGE_EXTRA_CHARS` are added to `extra_chars`.
+    :param split_identifiers: Split camelCase and PascalCase words, e.g., of
+        identifiers in source code, into their parts. snake_case words are
+        always split as underscores are no word characters.
+    """
+
+    # typographic apostrophes and the Catalan middle dot (e.g. "col·lecció")
+    LANGUAGE_EXTRA_CHARS = {"ca": "’·", "en": "’", "fr": "’", "it": "’"}
+
+    def __init__(self, extra_chars="'", language=None, split_identifiers=False):
+        chars = extra_chars + self.language_extra_chars(language)
+        self._extra_chars = chars
+        self._extra = frozenset(chars)
+        self._split_identifiers = split_identifiers
+        if chars:
+            # extra characters around words are added afterwards as a leading
+            # `[extra]*` would be retried at every character of long runs
+            pattern = "{word}+(?:[{extra}]+{word}+)*".format(
+                extra=re.escape(chars), word=_WORD_CHARS
+            )
+        else:
+            pattern = "{}+".format(_WORD_CHARS)
+        self._regex = _compile(pattern)
+
+    @classmethod
+    def language_extra_chars(cls, language):
+        """
+        Returns the extra characters of the language or its base language.
+        """
+        if not language:
+            return ""
+        chars = cls.LANGUAGE_EXTRA_CHARS.get(language)
+        if chars is None:
+            chars = cls.LANGUAGE_EXTRA_CHARS.get(language.split("_")[0], "")
+        return chars
+
+    @property
+    def extra_chars(self):
+        """
+        All extra characters, including the ones of the language.
+        """
+        return self._extra_chars
+
+    @property
+    def cache_key(self):
+        return type(self), self._extra_chars, self._split_identifiers
+
+    def tokenize(self, text):
+        extra = self._extra
+        length = len(text)
+        previous_end = 0
+        for match in self._regex.finditer(text):
+            start, end = match.span()
+            if extra:
+                while start > previous_end and text[start - 1] in extra:
+                    start -= 1
+                while end < length and text[end] in extra:
+                    end += 1
+                previous_end = end
+            if self._split_identifiers:
+                yield from _split_identifier(text, start, end)
+            else:
+                yield start, end
+
+
+def _resident_memory():
+    # resident set size of the process in bytes or `None` if it is unknown
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+class DictionaryPool:
+    """
+    Process-wide pool of Enchant brokers and dictionaries. There is one broker
+    per set of broker parameters and one dictionary per parameters and
+    language, shared by everyone acquiring it. By default, dictionaries are
+    freed as soon as nobody uses them anymore. With a memory limit, unused
+    dictionaries stay loaded until the limit is exceeded and are then freed in
+    least recently used order.
+
+    Worker threads obtain separate handles of a dictionary in use with
+    :meth:`acquire_worker`, as Enchant handles must not be used concurrently.
+    They are freed together with the dictionary's last user and receive the
+    words added with :meth:`add_to_session`.
+
+    The memory used by a dictionary is estimated by the growth of the resident
+    memory of the process while loading it, where this is unknown it counts as
+    zero.
+
+    :param memory_limit: Memory in bytes unused dictionaries may occupy in
+        total, `0` frees them immediately and `None` retains all of them.
+    """
+
+    class _Entry:
+        __slots__ = ("key", "dictionary", "references", "size", "workers", "session")
+
+        def __init__(self, key, dictionary, size):
+            self.key = key
+            self.dictionary = dictionary
+            self.references = 0
+            self.size = size
+            # handles of worker threads by thread identifier
+            self.workers = {}
+            # words added to the session, replayed on the worker handles
+            self.session = []
+
+    class _WorkerHandle:
+        __slots__ = ("entry", "thread", "dictionary", "size", "session", "busy")
+
+        def __init__(self, entry, thread, dictionary, size):
+            self.entry = entry
+            self.thread = thread
+            self.dictionary = dictionary
+            self.size = size
+            # number of session words added to the handle
+            self.session = 0
+            self.busy = 0
+
+    def __init__(self, memory_limit=0):
+        self._memory_limit = memory_limit
+        self._lock = threading.RLock()
+        self._brokers = {}
+        # brokers of the worker threads by parameters and thread identifier, a
+        # broker hands out the same handle for the same language
+        self._worker_brokers = {}
+        # entries by key, unused ones are moved to the end when released
+        self._entries = OrderedDict()
+        self._keys = {}
+        self._worker_handles = {}
+
+    @staticmethod
+    def params_key(params):
+        """
+        Return a hashable key for a dictionary of broker parameters.
+        """
+        return tuple(sorted(params.items())) if params else ()
+
+    @property
+    def memory_limit(self):
+        return self._memory_limit
+
+    @memory_limit.setter
+    def memory_limit(self, memory_limit):
+        with self._lock:
+            self._memory_limit = memory_limit
+            self._evict()
+
+    def broker(self, params=None):
+        """
+        Return the shared broker for the given broker parameters.
+        """
+        key = self.params_key(params)
+        with self._lock:
+            if key not in self._brokers:
+                broker = enchant().Broker()
+                for param, value in key:
+                    broker.set_param(param, value)
+                self._brokers[key] = broker
+            return self._brokers[key]
+
+    def acquire(self, language, params=None):
+        """
+        Return the shared dictionary for the language and broker parameters.
+        Every call has to be paired with a call to :meth:`release`.
+        """
+        key = (self.params_key(params), language)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                broker = self.broker(params)
+                before = _resident_memory()
+                dictionary = broker.request_dict(language)
+                after = _resident_memory()
+                size = 0 if before is None or after is None else max(0, after - before)
+                entry = self._entries[key] = self._Entry(key, dictionary, size)
+                self._keys[id(dictionary)] = key
+            entry.references += 1
+            return entry.dictionary
+
+    def release(self, dictionary):
+        """
+        Give back a dictionary obtained by :meth:`acquire`.
+        """
+        with self._lock:
+            key = self._keys.get(id(dictionary))
+            if key is None:
+                return
+            entry = self._entries[key]
+            entry.references -= 1
+            if entry.references <= 0:
+                entry.references = 0
+                self._free_workers(entry)
+                self._entries.move_to_end(key)
+                self._evict()
+
+    def acquire_worker(self, language, params=None):
+        """
+        Return a handle of the dictionary for the language and broker parameters
+        owned by the calling thread or `None` if the dictionary is not in use.
+        The handle is loaded on first use. Every call returning a handle has to
+        be paired with a call to :meth:`release_worker` from the same thread.
+        """
+        key = (self.params_key(params), language)
+        thread = threading.get_ident()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.references:
+                return None
+            handle = entry.workers.get(thread)
+            if handle is None:
+                # brokers and their handles are only used while the pool is
+                # locked, except for checking words with a busy handle
+                broker_key = (key[0], thread)
+                broker = self._worker_brokers.get(broker_key)
+                if broker is None:
+                    broker = self._worker_brokers[broker_key] = enchant().Broker()
+                    for param, value in key[0]:
+                        broker.set_param(param, value)
+                before = _resident_memory()
+                dictionary = broker.request_dict(language)
+                after = _resident_memory()
+                size = 0 if before is None or after is None else max(0, after - before)
+                handle = self._WorkerHandle(entry, thread, dictionary, size)
+                entry.workers[thread] = handle
+                self._worker_handles[id(dictionary)] = handle
+            handle.busy += 1
+            for word in entry.session[handle.session :]:
+                handle.dictionary.add_to_session(word)
+            handle.session = len(entry.session)
+            return handle.dictionary
+
+    def release_worker(self, dictionary):
+        """
+        Give back a handle obtained by :meth:`acquire_worker`.
+        """
+        with self._lock:
+            handle = self._worker_handles.get(id(dictionary))
+            if handle is None:
+                return
+            handle.busy -= 1
+            entry = handle.entry
+            if not handle.busy and (
+                self._entries.get(entry.key) is not entry or not entry.references
+            ):
+                self._free_worker(handle)
+
+    def add_to_session(self, dictionary, word):
+        """
+        Add a word to the session of a dictionary obtained by :meth:`acquire`
+        and of its worker handles.
+        """
+        with self._lock:
+            dictionary.add_to_session(word)
+            key = self._keys.get(id(dictionary))
+            if key is not None:
+                self._entries[key].session.append(word)
+
+    def clear(self):
+        """
+        Free all dictionaries which are not in use.
+        """
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if not entry.references:
+                    self._free(entry)
+
+    def loaded(self):
+        """
+        Return a list of dictionaries with the language, broker parameters,
+        number of users and estimated size in bytes of every loaded dictionary.
+        """
+        with self._lock:
+            return [
+                {
+                    "language": entry.key[1],
+                    "params": dict(entry.key[0]),
+                    "references": entry.references,
+                    "workers": len(entry.workers),
+                    "size": entry.size
+                    + sum(handle.size for handle in entry.workers.values()),
+                }
+                for entry in self._entries.values()
+            ]
+
+    def _evict(self):
+        if self._memory_limit is None:
+            return
+        unused = [entry for entry in self._entries.values() if not entry.references]
+        total = sum(entry.size for entry in unused)
+        for entry in unused:
+            # dictionaries of unknown size are only retained by a positive limit
+            if total <= self._memory_limit and self._memory_limit:
+                break
+            total -= entry.size
+            self._free(entry)
+
+    def _free(self, entry):
+        del self._entries[entry.key]
+        del self._keys[id(entry.dictionary)]
+        self._free_workers(entry)
+        self._free_dictionary(entry.dictionary)
+
+    def _free_workers(self, entry):
+        # busy handles are freed when they are released
+        for handle in list(entry.workers.values()):
+            if not handle.busy:
+                self._free_worker(handle)
+
+    def _free_worker(self, handle):
+        del handle.entry.workers[handle.thread]
+        del self._worker_handles[id(handle.dictionary)]
+        self._free_dictionary(handle.dictionary)
+
+    @staticmethod
+    def _free_dictionary(dictionary):
+        try:
+            dictionary._free()
+        except enchant().Error as e:
+            logger.warning("failure freeing dictionary: {}".format(e))
+
+
+class SpellingEngine:
+    """
+    Spellchecking engine operating on plain strings.
+
+    :param dictionary: The Enchant dictionary used for checking words.
+    :param extra_chars: Extra characters beyond which words are extended.
+    :param filters: Dictionary mapping filter types to lists of regexes,
+        defaults to :attr:`DEFAULT_FILTERS`.
+    :param cache_key: Hashable identity of the dictionary used to share verdicts
+        with other engines using the same dictionary, defaults to the
+        dictionary's tag.
+    :param tokenizer: The :class:`Tokenizer` splitting texts into words,
+        defaults to a :class:`RegexTokenizer` for `extra_chars`.
+
+    .. attribute:: stats
+
+        Statistics object recording the timings of the tokenization, the
+        filters and the dictionary lookups or `None`, the default, to record
+        nothing. Set by :attr:`gtkspellcheck.SpellChecker.collect_stats`.
+
+    .. attribute:: verdict_store
+
+        The :class:`VerdictStore` consulted before the dictionary or `None`, the
+        default. Verdicts are only stored for cache keys registered with it.
+        Set by :attr:`gtkspellcheck.SpellChecker.verdict_store`.
+    """
+
+    stats = None
+
+    verdict_store = None
+
+    FILTER_WORD = "word"
+    FILTER_LINE = "line"
+    FILTER_TEXT = "text"
+
+    DEFAULT_FILTERS = {
+        FILTER_WORD: [r"[0-9.,]+"],
+        FILTER_LINE: [
+            (r"(https?|ftp|file):((//)|(\\\\))+[\w\d:" r"#@%/;$()~_?+-=\\.&]+"),
+            r"[\w\d]+@[\w\d.]+",
+        ],
+        FILTER_TEXT: [],
+    }
+
+    DEFAULT_EXTRA_CHARS = "'"
+
+    def __init__(
+        self,
+        dictionary,
+        extra_chars=DEFAULT_EXTRA_CHARS,
+        filters=None,
+        cache_key=None,
+        tokenizer=None,
+    ):
+        self._dictionary = dictionary
+        self._cache_key = dictionary.tag if cache_key is None else cache_key
+        # words accepted via `accept` per dictionary, these take precedence over
+        # the shared verdict cache
+        self._accepted_words = {}
+        if filters is None:
+            filters = SpellingEngine.DEFAULT_FILTERS
+        # filters are kept as immutable tuples, their compiled regexes are shared
+        # by all engines with the same filters
+        self._filters = {
+            filter_type: tuple(filters.get(filter_type, ()))
+            for filter_type in (
+                SpellingEngine.FILTER_WORD,
+                SpellingEngine.FILTER_LINE,
+                SpellingEngine.FILTER_TEXT,
+            )
+        }
+        self._regexes = {}
+        self._filter_generation = 0
+        for filter_type in self._filters:
+            self._compile_filter(filter_type)
+        self._default_tokenizer_key = None
+        self.extra_chars = extra_chars
+        self._tokenizer = tokenizer
+        # the dictionary generation the results of an engine checking in a
+        # worker thread are computed for, `None` for the current one
+        self._checked_generation = None
+
+    @property
+    def dictionary(self):
+        """
+        The Enchant dictionary used for checking words.
+        """
+        return self._dictionary
+
+    @property
+    def cache_key(self):
+        """
+        The identity of the dictionary used for sharing verdicts.
+        """
+        return self._cache_key
+
+    def set_dictionary(self, dictionary, cache_key=None):
+        """
+        Use another dictionary, e.g., after the language has changed.
+
+        :param dictionary: The new Enchant dictionary.
+        :param cache_key: Identity of the new dictionary.
+        """
+        self._dictionary = dictionary
+        self._cache_key = dictionary.tag if cache_key is None else cache_key
+        self._update_default_tokenizer()
+
+    def with_dictionary(self, dictionary, cache_key=None, dictionary_generation=None):
+        """
+        Returns an engine sharing filters, extra characters and accepted words
+        with this engine but using another dictionary. This allows checking with
+        a separate dictionary handle per thread.
+
+        :param dictionary: The Enchant dictionary of the new engine.
+        :param cache_key: Identity of the dictionary.
+        :param dictionary_generation: The :attr:`dictionary_generation` the
+            handle reflects. Once the generation has advanced, the new engine
+            neither caches nor stores the verdicts it computes.
+        """
+        engine = copy.copy(self)
+        engine.set_dictionary(dictionary, cache_key)
+        engine._checked_generation = dictionary_generation
+        return engine
+
+    def with_tokenizer(self, tokenizer):
+        """
+        Returns an engine sharing dictionary, filters, extra characters and
+        accepted words with this engine but using another tokenizer.
+
+        :param tokenizer: The :class:`Tokenizer` of the new engine.
+        """
+        engine = copy.copy(self)
+        engine.tokenizer = tokenizer
+        return engine
+
+    @property
+    def extra_chars(self):
+        """
+        Extra characters beyond which words are extended.
+        """
+        return self._extra_chars
+
+    @extra_chars.setter
+    def extra_chars(self, chars):
+        self._extra_chars = chars
+        self._update_default_tokenizer()
+
+    def _update_default_tokenizer(self):
+        # the default tokenizer adds the extra characters of the dictionary's
+        # language, it is only rebuilt if these or the extra characters change
+        key = (self._extra_chars, self._dictionary.tag)
+        if key != self._default_tokenizer_key:
+            self._default_tokenizer_key = key
+            self._default_tokenizer = RegexTokenizer(*key)
+
+    @property
+    def tokenizer(self):
+        """
+        The :class:`Tokenizer` splitting texts into words. Assigning `None`
+        restores the default :class:`RegexTokenizer` for :attr:`extra_chars`
+        and the language of the dictionary.
+        """
+        return self._tokenizer or self._default_tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, tokenizer):
+        self._tokenizer = tokenizer
+
+    def append_filter(self, regex, filter_type):
+        """
+        Append a new filter to the filter list, see
+        :meth:`gtkspellcheck.SpellChecker.append_filter` for the filter types.
+
+        :param regex: The regex used for filtering.
+        :param filter_type: The type of the filter.
+        """
+        self._filters[filter_type] += (regex,)
+        self._compile_filter(filter_type)
+
+    def remove_filter(self, regex, filter_type):
+        """
+        Remove a filter from the filter list.
+
+        :param regex: The regex which used for filtering.
+        :param filter_type: The type of the filter.
+        """
+        filters = list(self._filters[filter_type])
+        filters.remove(regex)
+        self._filters[filter_type] = tuple(filters)
+        self._compile_filter(filter_type)
+
+    @property
+    def filter_generation(self):
+        """
+        Incremented whenever a filter is added or removed.
+        """
+        return self._filter_generation
+
+    def has_filters(self, filter_type):
+        """
+        Checks whether any filter of the given type is registered.
+        """
+        return bool(self._filters[filter_type])
+
+    def accept(self, word):
+        """
+        Treat a word as correct from now on, e.g., because it has been added to
+        the personal word list or the dictionary's session.
+
+        :param word: The word to accept.
+        """
+        self._accepted_words.setdefault(self._cache_key, set()).add(word)
+        verdict_cache.put(self.verdict_key(word), True)
+        if self.verdict_store is not None:
+            # a stored verdict may be outdated, the word is checked again once
+            # the cached one has been evicted
+            self.verdict_store.discard(self._cache_key, word)
+        # Enchant accepts the capitalized and upper-case forms of the word as well,
+        # their verdicts are looked up again
+        for variant in {word.capitalize(), word.upper()} - {word}:
+            verdict_cache.discard(self.verdict_key(variant))
+            if self.verdict_store is not None:
+                self.verdict_store.discard(self._cache_key, variant)
+        self._advance_dictionary_generation()
+
+    def forget(self, word):
+        """
+        Drop the cached and stored verdicts of a word, e.g., because a related
+        word has been accepted.
+
+        :param word: The word to forget.
+        """
+        verdict_cache.discard(self.verdict_key(word))
+        if self.verdict_store is not None:
+            self.verdict_store.discard(self._cache_key, word)
+        self._advance_dictionary_generation()
+
+    @property
+    def dictionary_generation(self):
+        """
+        Incremented whenever words of the dictionary are accepted or forgotten
+        by any engine.
+        """
+        return _dictionary_generations.get(self._cache_key, 0)
+
+    def _advance_dictionary_generation(self):
+        _dictionary_generations[self._cache_key] = self.dictionary_generation + 1
+
+    def _verdict_generation(self):
+        # the dictionary generation the verdicts of this engine are computed for
+        if self._checked_generation is None:
+            return self.dictionary_generation
+        return self._checked_generation
+
+    def verdict_key(self, word):
+        """
+        The key of the word's verdict in the shared verdict cache.
+        """
+        return self._cache_key, word
+
+    def is_correct(self, word):
+        """
+        Checks whether a single word is spelled correctly. This does not apply
+        any filters and may raise :class:`enchant.Error`.
+
+        :param word: The word to check.
+        """
+        if word in self._accepted_words.get(self._cache_key, ()):
+            return True
+        key = self.verdict_key(word)
+        correct = verdict_cache.get(key)
+        if correct is None:
+            generation = self._verdict_generation()
+            store = self.verdict_store
+            if store is not None:
+                correct = store.get(self._cache_key, word)
+            checked = correct is None
+            if checked:
+                stats = self.stats
+                if stats is not None:
+                    started = time.perf_counter()
+                correct = self._dictionary.check(word)
+                if stats is not None:
+                    stats.record("enchant.check", time.perf_counter() - started)
+            # a verdict of a dictionary that has changed meanwhile may be outdated
+            if generation == self.dictionary_generation:
+                if checked and store is not None:
+                    store.put(self._cache_key, word, correct)
+                verdict_cache.put(key, correct)
+        return correct
+
+    def suggest(self, word):
+        """
+        Returns a list of suggestions for a misspelled word. This may raise
+        :class:`enchant.Error`.
+
+        :param word: The misspelled word.
+        """
+        key = self.verdict_key(word)
+        suggestions = suggestion_cache.get(key)
+        if suggestions is None:
+            stats = self.stats
+            if stats is not None:
+                started = time.perf_counter()
+            suggestions = tuple(self._dictionary.suggest(word))
+            if stats is not None:
+                stats.record("enchant.suggest", time.perf_counter() - started)
+            suggestion_cache.put(key, suggestions)
+        return list(suggestions)
+
+    def cached_suggestions(self, word):
+        """
+        Returns the suggestions for a word if they are cached or `None`.
+        """
+        suggestions = suggestion_cache.get(self.verdict_key(word))
+        return None if suggestions is None else list(suggestions)
+
+    def is_filtered_word(self, word):
+        """
+        Checks whether a word is matched by a word filter.
+        """
+        if not self._filters[SpellingEngine.FILTER_WORD]:
+            return False
+        stats = self.stats
+        if stats is None:
+            return bool(self._regexes[SpellingEngine.FILTER_WORD].match(word))
+        started = time.perf_counter()
+        filtered = bool(self._regexes[SpellingEngine.FILTER_WORD].match(word))
+        stats.record("filter.word", time.perf_counter() - started)
+        return filtered
+
+    def filter_spans(self, filter_type, text, start=0, end=None):
+        """
+        Returns the spans of all matches of the filters of the given type. If
+        `start` or `end` are given, only matches starting within this range of
+        the text are returned.
+        """
+        if not self._filters[filter_type]:
+            return []
+        stats = self.stats
+        if stats is not None:
+            started = time.perf_counter()
+        spans = []
+        for match in self._regexes[filter_type].finditer(text, start):
+            if end is not None and match.start() > end:
+                break
+            spans.append(match.span())
+        if stats is not None:
+            stats.record("filter." + filter_type, time.perf_counter() - started)
+        return spans
+
+    def tokenize(self, text):
+        """
+        Iterates over the `(start, end)` spans of the words of the text.
+        """
+        stats = self.stats
+        if stats is None:
+            # tokenizers may return any iterable
+            return iter(self.tokenizer.tokenize(text))
+        started = time.perf_counter()
+        spans = list(self.tokenizer.tokenize(text))
+        stats.record("tokenize", time.perf_counter() - started)
+        return iter(spans)
+
+    def check_text(self, text, excluded=None, counts=None, partial=(False, False)):
+        """
+        Checks the spelling of the text and returns a list of `(start, end, word)`
+        tuples for all misspelled words.
+
+        The results of lines without excluded spans are cached in
+        :data:`paragraph_cache` by a digest of their text, the dictionary and its
+        :attr:`dictionary_generation`, the word and line filters and the
+        tokenizer's :attr:`Tokenizer.cache_key`, such that unchanged lines are
+        not checked again.
+
+        :param text: The text to check.
+        :param excluded: :class:`IntervalIndex` of text filter matches relative to
+            the text, if the text is part of a larger document. Computed from the
+            text if `None`.
+        :param counts: Dictionary in which the numbers of `checked`, `skipped`
+            and `misspelled` words are stored.
+        :param partial: Whether the first and the last line of the text are parts
+            of longer lines. Line filters need to see whole lines and are not
+            applied to these, their matches have to be part of `excluded`.
+        """
+        if excluded is None:
+            excluded = IntervalIndex(
+                self.filter_spans(SpellingEngine.FILTER_TEXT, text)
+            )
+        paragraph_key = (
+            self._cache_key,
+            self._verdict_generation(),
+            self._filters[SpellingEngine.FILTER_WORD],
+            self._filters[SpellingEngine.FILTER_LINE],
+            self.tokenizer.cache_key,
+        )
+        # parts of lines without excluded spans are checked like lines without
+        # line filters
+        partial_key = paragraph_key[:3] + ((),) + paragraph_key[4:]
+        misspelled = []
+        checked = skipped = 0
+        line_start = 0
+        while line_start < len(text):
+            line_end = text.find("\n", line_start)
+            if line_end < 0:
+                line_end = len(text)
+            if line_end > line_start:
+                line = text[line_start:line_end]
+                line_excluded = excluded.slice(line_start, line_end)
+                filtered = not (
+                    (partial[0] and line_start == 0)
+                    or (partial[1] and line_end == len(text))
+                )
+                if line_excluded:
+                    # excluded spans depend on the surrounding text
+                    result, _complete = self._check_paragraph(
+                        line, line_excluded, filtered
+                    )
+                else:
+                    digest = hashlib.blake2b(
+                        line.encode("utf-8", "surrogatepass"), digest_size=16
+                    ).digest()
+                    key = (digest, paragraph_key if filtered else partial_key)
+                    result = paragraph_cache.get(key)
+                    if result is None:
+                        result, complete = self._check_paragraph(
+                            line, line_excluded, filtered
+                        )
+                        if complete:
+                            paragraph_cache.put(key, result)
+                checked += result[0]
+                skipped += result[1]
+                misspelled.extend(
+                    (line_start + start, line_start + end, line[start:end])
+                    for start, end in result[2]
+                )
+            line_start = line_end + 1
+        if counts is not None:
+            counts["checked"] = checked
+            counts["skipped"] = skipped
+            counts["misspelled"] = len(misspelled)
+        return misspelled
+
+    def _check_paragraph(self, text, excluded, filtered=True):
+        # returns the numbers of checked and skipped words and the spans of the
+        # misspelled words of a single line and whether all words were checked,
+        # the line filters are only applied if `filtered` is set
+        line_spans = None
+        if filtered and self.has_filters(SpellingEngine.FILTER_LINE):
+            line_spans = IntervalIndex(
+                self.filter_spans(SpellingEngine.FILTER_LINE, text)
+            )
+        misspelled = []
+        checked = skipped = 0
+        complete = True
+        for start, end in self.tokenize(text):
+            word = text[start:end]
+            if self.is_filtered_word(word):
+                skipped += 1
+                continue
+            if line_spans and line_spans.covering(start) is not None:
+                skipped += 1
+                continue
+            if excluded and excluded.covering(start) is not None:
+                skipped += 1
+                continue
+            checked += 1
+            try:
+                correct = self.is_correct(word)
+            except enchant().Error as e:
+                logger.warning("failure checking word: {}".format(e))
+                complete = False
+            else:
+                if not correct:
+                    misspelled.append((start, end))
+        return (checked, skipped, tuple(misspelled)), complete
+
+    def _compile_filter(self, filter_type):
+        self._filter_generation += 1
+        flags = re.MULTILINE if filter_type == SpellingEngine.FILTER_TEXT else 0
+        self._regexes[filter_type] = _compile(
+            "|".join(self._filters[filter_type]), flags
+        )
+
+
+# process-wide pool of brokers and dictionaries shared by all spellcheckers
+dictionary_pool = DictionaryPool()
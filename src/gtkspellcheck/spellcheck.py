@@ -22,13 +22,18 @@ based on Enchant. It supports both GTK 3 and 4 via PyGObject with Python 3. For
 automatic translation of the user interface it can use Gedit’s translation files.
 """
 
-import enchant
+import concurrent.futures
 import gettext
 import logging
-import re
 import sys
+import threading
+import time
+import weakref
 from collections import UserList
 
+from . import engine as _engine
+from ._cache import LRUCache
+from ._stats import Statistics
 from ._pylocales import code_to_name as _code_to_name
 from ._pylocales import LanguageNotFound, CountryNotFound
 
@@ -46,7 +51,7 @@ else:
 _IS_GTK3 = Gtk.MAJOR_VERSION < 4
 
 # public objects
-__all__ = ["SpellChecker", "NoDictionariesFound"]
+__all__ = ["SpellChecker", "NoDictionariesFound", "PangoTokenizer"]
 
 # logger
 logger = logging.getLogger(__name__)
@@ -65,23 +70,60 @@ _GEDIT_MAP = {
     "Ignore All": "Ignore _All",
     "Suggestions": "Suggestions",
     "(no suggestions)": "(no suggested words)",
+    "(loading suggestions)": "(loading suggestions)",
     "Add to Dictionary": "Add w_ord",
     "Unknown": "Unknown",
 }
 
 _BATCHING_THRESHOLD_CHARS = 1500
-_BATCH_SIZE_CHARS = 1000
+_BATCH_MIN_SIZE_CHARS = 500
+_BATCH_BUDGET_MS = 8.0
+_VISIBLE_MARGIN_LINES = 50
 
-# translation
-if gettext.find("gedit"):
-    _gedit = gettext.translation("gedit", fallback=True).gettext
+# additional characters rescanned for text filter matches after modifications
+_TEXT_FILTER_SLACK_CHARS = 4096
 
-    def _(message):
-        return _gedit(_GEDIT_MAP[message]).replace("_", "")
+# number of lines for which line filter matches are remembered
+_LINE_FILTER_CACHE_SIZE = 256
 
-else:
+_BULK_CHECKING_THRESHOLD_CHARS = 256
+
+# insertions with more characters are checked in idle time
+_LARGE_INSERT_THRESHOLD_CHARS = 10000
+
+_WORKER_THREADS = 2
+
+# time the context menu waits for suggestions before showing a placeholder
+_SUGGESTION_WAIT_SECONDS = 0.05
+# misspellings within this many lines around the cursor get suggestions prefetched
+_PREFETCH_LINES = 2
+_PREFETCH_WORDS = 3
+
+# worker pool shared by all instances with threaded checking enabled
+_executor = None
+# single worker shared by all instances for suggestions, such that looking up
+# and prefetching suggestions loads at most one more handle per dictionary
+_suggestion_executor = None
+_executor_lock = threading.Lock()
+
+# translation, looked up when the first message is translated because finding
+# Gedit's catalog searches the file system
+_translate = None
+
+
+def _load_translation():
+    if gettext.find("gedit"):
+        gedit = gettext.translation("gedit", fallback=True).gettext
+        return lambda message: gedit(_GEDIT_MAP[message]).replace("_", "")
     locale_name = "py{}gtkspellcheck".format(sys.version_info.major)
-    _ = gettext.translation(locale_name, fallback=True).gettext
+    return gettext.translation(locale_name, fallback=True).gettext
+
+
+def _(message):
+    global _translate
+    if _translate is None:
+        _translate = _load_translation()
+    return _translate(message)
 
 
 def code_to_name(code, separator="_"):
@@ -91,6 +133,82 @@ def code_to_name(code, separator="_"):
         return "{} ({})".format(_("Unknown"), code)
 
 
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                _WORKER_THREADS, thread_name_prefix="gtkspellcheck"
+            )
+        return _executor
+
+
+def _get_suggestion_executor():
+    global _suggestion_executor
+    with _executor_lock:
+        if _suggestion_executor is None:
+            _suggestion_executor = concurrent.futures.ThreadPoolExecutor(
+                1, thread_name_prefix="gtkspellcheck-suggest"
+            )
+        return _suggestion_executor
+
+
+def _check_in_worker(pool, engine, params, language, job, text, excluded, partial):
+    # every worker thread uses its own handle of the pooled dictionary, `None`
+    # if the language has been changed meanwhile and the result is discarded
+    dictionary = pool.acquire_worker(language, params)
+    if dictionary is None:
+        return []
+    try:
+        engine = engine.with_dictionary(
+            dictionary, job.cache_key, job.dictionary_generation
+        )
+        return engine.check_text(text, excluded, job.counts, partial)
+    finally:
+        pool.release_worker(dictionary)
+
+
+def _suggest_in_worker(pool, engine, params, language, cache_key, word):
+    dictionary = pool.acquire_worker(language, params)
+    if dictionary is None:
+        return ()
+    try:
+        return engine.with_dictionary(dictionary, cache_key).suggest(word)
+    finally:
+        pool.release_worker(dictionary)
+
+
+def _merge_spans(spans):
+    # returns the union of the spans as sorted and disjoint spans
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_spans(spans, others):
+    # returns the parts of the sorted and disjoint spans not covered by the
+    # sorted and disjoint other spans
+    result = []
+    index = 0
+    for start, end in spans:
+        while index < len(others) and others[index][1] <= start:
+            index += 1
+        position = index
+        while start < end and position < len(others) and others[position][0] < end:
+            other_start, other_end = others[position]
+            if other_start > start:
+                result.append((start, other_start))
+            start = max(start, other_end)
+            position += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
 class SpellChecker(GObject.Object):
     """
     Main spellchecking class, everything important happens here.
@@ -113,48 +231,146 @@ class SpellChecker(GObject.Object):
             Checks if a language exists.
 
             :param language: language to check
+
+    .. attribute:: verdict_cache
+
+        Process-wide cache of dictionary verdicts shared by all instances. It
+        is keyed by language, broker parameters and word. Use its `stats()`
+        method to obtain hit and miss counters and assign to its `maxsize` to
+        change the number of remembered words.
+
+    .. attribute:: paragraph_cache
+
+        Process-wide cache of the misspelled words of checked lines shared by
+        all instances. It is keyed by a digest of the line's text, the
+        dictionary and the words accepted for it, the filters and the
+        tokenizer. Lines checked from snapshots of the text, i.e., of large
+        ranges such as rechecks or of all ranges with a :attr:`tokenizer`, are
+        only checked again if any of these changed. Use
+        its `stats()` method to obtain the hit rate and assign to its `maxsize`
+        to change the number of remembered lines.
+
+    .. attribute:: dictionary_pool
+
+        Process-wide :class:`gtkspellcheck.engine.DictionaryPool` of Enchant
+        brokers and dictionaries shared by all instances using the same
+        language and broker parameters. Use its `loaded()` method to list the
+        loaded dictionaries. Dictionaries no instance uses anymore are freed
+        unless a `memory_limit` in bytes is assigned, up to which they are
+        retained for reuse. As dictionaries are shared, words ignored with
+        `ignore_all` are ignored by all instances using the same dictionary.
+
+    .. attribute:: stats_hook
+
+        Callable invoked with a dictionary of the numbers of every checked
+        range, i.e., its `start` and `end` offsets, `duration_ms` and the
+        counters of :meth:`get_stats`, while :attr:`collect_stats` is enabled.
+
+    .. attribute:: engine
+
+        The :class:`gtkspellcheck.engine.SpellingEngine` doing the actual
+        tokenization, filtering and checking.
+
+    Signals:
+
+    ``recheck-progress(fraction)``: Emitted after every batch of a batched
+        recheck with the fraction of the buffer checked so far.
+
+    ``recheck-finished()``: Emitted when a recheck of the whole text is done,
+        with :attr:`threaded_checking` once the results of all threaded checks
+        have been applied.
+
+    ``misspelling-added(start, end)``: Emitted with the offsets of a word which
+        has been tagged as misspelled.
+
+    ``misspelling-removed(start, end)``: Emitted with the offsets of a word which
+        is not tagged as misspelled anymore, either because it has been checked
+        again or because it has been deleted. The offsets of deleted words refer
+        to the text before the deletion.
     """
 
-    FILTER_WORD = "word"
-    FILTER_LINE = "line"
-    FILTER_TEXT = "text"
-
-    DEFAULT_FILTERS = {
-        FILTER_WORD: [r"[0-9.,]+"],
-        FILTER_LINE: [
-            (r"(https?|ftp|file):((//)|(\\\\))+[\w\d:" r"#@%/;$()~_?+-=\\.&]+"),
-            r"[\w\d]+@[\w\d.]+",
-        ],
-        FILTER_TEXT: [],
+    __gsignals__ = {
+        "recheck-progress": (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        "recheck-finished": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        "misspelling-added": (GObject.SignalFlags.RUN_FIRST, None, (int, int)),
+        "misspelling-removed": (GObject.SignalFlags.RUN_FIRST, None, (int, int)),
     }
 
-    DEFAULT_EXTRA_CHARS = "'"
+    FILTER_WORD = _engine.SpellingEngine.FILTER_WORD
+    FILTER_LINE = _engine.SpellingEngine.FILTER_LINE
+    FILTER_TEXT = _engine.SpellingEngine.FILTER_TEXT
+
+    DEFAULT_FILTERS = _engine.SpellingEngine.DEFAULT_FILTERS
+
+    DEFAULT_EXTRA_CHARS = _engine.SpellingEngine.DEFAULT_EXTRA_CHARS
+
+    verdict_cache = _engine.verdict_cache
+    paragraph_cache = _engine.paragraph_cache
+
+    dictionary_pool = _engine.dictionary_pool
+
+    # GTK 4 languages menu models by language codes
+    _languages_menus = {}
 
     class _LanguageList(UserList):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            self.mapping = dict(self)
+        # sorted lists of codes and names shared between all instances, the names
+        # are only resolved when the list is accessed for the first time
+        _resolved = {}
+        _interned = {}
+
+        def __init__(self, initlist=None, codes=None):
+            self._data = None
+            if codes is None:
+                self._data = list(initlist) if initlist is not None else []
+                codes = [code for code, _name in self._data]
+            codes = tuple(sorted(set(codes)))
+            self._codes, self._known = SpellChecker._LanguageList._interned.setdefault(
+                codes, (codes, frozenset(codes))
+            )
 
         @classmethod
         def from_broker(cls, broker):
-            return cls(
-                sorted(
-                    [
-                        (language, code_to_name(language))
-                        for language in broker.list_languages()
-                    ],
-                    key=lambda language: language[1],
-                )
-            )
+            return cls(codes=broker.list_languages())
+
+        @property
+        def data(self):
+            if self._data is None:
+                resolved = SpellChecker._LanguageList._resolved.get(self._codes)
+                if resolved is None:
+                    resolved = tuple(
+                        sorted(
+                            [(code, code_to_name(code)) for code in self._codes],
+                            key=lambda language: language[1],
+                        )
+                    )
+                    SpellChecker._LanguageList._resolved[self._codes] = resolved
+                self._data = list(resolved)
+            return self._data
+
+        @data.setter
+        def data(self, data):
+            self._data = data
+
+        @property
+        def mapping(self):
+            return dict(self.data)
+
+        def __len__(self):
+            if self._data is None:
+                return len(self._codes)
+            return len(self._data)
 
         def exists(self, language):
-            return language in self.mapping
+            if self._data is None:
+                return language in self._known
+            return any(code == language for code, _name in self._data)
 
     class _Mark:
+        __slots__ = ("_buffer", "_mark", "_iter_worker")
+
         def __init__(self, buffer, name, start, iter_worker):
             self._buffer = buffer
-            self._name = name
-            self._mark = self._buffer.create_mark(self._name, start, True)
+            self._mark = self._buffer.create_mark(name, start, True)
             self._iter_worker = iter_worker
 
         @property
@@ -178,7 +394,174 @@ class SpellChecker(GObject.Object):
         def move(self, location):
             self._buffer.move_mark(self._mark, location)
 
+    class _ThreadedCheck:
+        def __init__(self, buffer, start, end, excluded, force_all, generation, engine):
+            self.buffer = buffer
+            self.start = buffer.create_mark(None, start, True)
+            self.end = buffer.create_mark(None, end, False)
+            self.excluded = excluded
+            self.force_all = force_all
+            self.generation = generation
+            # the state of the engine the range is checked with
+            self.cache_key = engine.cache_key
+            self.dictionary_generation = engine.dictionary_generation
+            self.filter_generation = engine.filter_generation
+            # filled by the worker
+            self.counts = {}
+            self.submitted = time.perf_counter()
+
+        def is_stale(self, engine):
+            return (
+                self.cache_key != engine.cache_key
+                or self.dictionary_generation != engine.dictionary_generation
+                or self.filter_generation != engine.filter_generation
+            )
+
+        @property
+        def iters(self):
+            return (
+                self.buffer.get_iter_at_mark(self.start),
+                self.buffer.get_iter_at_mark(self.end),
+            )
+
+        def dispose(self):
+            self.buffer.delete_mark(self.start)
+            self.buffer.delete_mark(self.end)
+
+    class _RecheckJob:
+        def __init__(self, checker, start, end, full=True):
+            self._checker = checker
+            self._buffer = checker._buffer
+            # only rechecks of the whole text report their progress
+            self._full = full
+            self._total = 0
+            # regions which still need to be checked as marks and whether the word
+            # at the cursor is checked as well
+            self._pending = []
+            self.add(start, end, full)
+            # measured throughput in characters per second
+            self._rate = None
+            self._source = GLib.idle_add(self._step, priority=checker._recheck_priority)
+
+        def add(self, start, end, force_all=False):
+            self._total += max(end.get_offset() - start.get_offset(), 1)
+            self._pending.append(self._create_region(start, end, force_all))
+
+        def cancel(self):
+            if self._source is not None:
+                GLib.source_remove(self._source)
+                self._source = None
+            self._dispose()
+
+        def _dispose(self):
+            for region in self._pending:
+                self._delete_region(region)
+            self._pending = []
+
+        def _create_region(self, start, end, force_all):
+            return (
+                self._buffer.create_mark(None, start, True),
+                self._buffer.create_mark(None, end, False),
+                force_all,
+            )
+
+        def _delete_region(self, region):
+            self._buffer.delete_mark(region[0])
+            self._buffer.delete_mark(region[1])
+
+        def _region_iters(self, region):
+            return (
+                self._buffer.get_iter_at_mark(region[0]),
+                self._buffer.get_iter_at_mark(region[1]),
+            )
+
+        def _next_chunk(self, size):
+            # prefer the pending region closest to the visible range and work
+            # outward from it, the visible range is determined anew for every
+            # chunk such that scrolling reprioritizes the remaining work
+            visible = self._checker._visible_range()
+            best = None
+            for index, region in enumerate(self._pending):
+                start, end = self._region_iters(region)
+                if visible is None:
+                    distance, anchor, backward = 0, start, False
+                elif end.compare(visible[0]) <= 0:
+                    distance = visible[0].get_offset() - end.get_offset()
+                    anchor, backward = end, True
+                elif start.compare(visible[1]) >= 0:
+                    distance = start.get_offset() - visible[1].get_offset()
+                    anchor, backward = start, False
+                else:
+                    distance, backward = 0, False
+                    anchor = visible[0] if start.compare(visible[0]) < 0 else start
+                if best is None or distance < best[0]:
+                    best = (distance, index, anchor, backward)
+            _distance, index, anchor, backward = best
+            region = self._pending.pop(index)
+            force_all = region[2]
+            region_start, region_end = self._region_iters(region)
+            if backward:
+                chunk_start = anchor.copy()
+                chunk_start.backward_chars(size)
+                if chunk_start.compare(region_start) < 0:
+                    chunk_start = region_start
+                chunk_end = anchor
+            else:
+                chunk_start = anchor
+                chunk_end = anchor.copy()
+                chunk_end.forward_chars(size)
+                self._checker._iter_worker.forward_word_end(chunk_end)
+                if chunk_end.compare(region_end) > 0:
+                    chunk_end = region_end
+            remaining = []
+            if region_start.compare(chunk_start) < 0:
+                remaining.append(
+                    self._create_region(region_start, chunk_start, force_all)
+                )
+            if chunk_end.compare(region_end) < 0:
+                remaining.append(self._create_region(chunk_end, region_end, force_all))
+            self._pending[index:index] = remaining
+            self._delete_region(region)
+            return chunk_start, chunk_end, force_all
+
+        def _remaining(self):
+            remaining = 0
+            for region in self._pending:
+                start, end = self._region_iters(region)
+                remaining += max(end.get_offset() - start.get_offset(), 0)
+            return remaining
+
+        def _step(self):
+            checker = self._checker
+            deadline = time.monotonic() + checker._recheck_budget / 1000
+            while self._pending:
+                now = time.monotonic()
+                size = _BATCH_MIN_SIZE_CHARS
+                if self._rate is not None:
+                    size = max(size, int(self._rate * (deadline - now)))
+                start, end, force_all = self._next_chunk(size)
+                checker.check_range(start, end, force_all)
+                rate = (end.get_offset() - start.get_offset()) / max(
+                    time.monotonic() - now, 1e-6
+                )
+                self._rate = rate if self._rate is None else (self._rate + rate) / 2
+                if self._pending and time.monotonic() >= deadline:
+                    if self._full:
+                        checker.emit(
+                            "recheck-progress",
+                            1 - min(self._remaining() / self._total, 1),
+                        )
+                    return GLib.SOURCE_CONTINUE
+            self._source = None
+            checker._recheck_job = None
+            if self._full:
+                checker.emit("recheck-progress", 1.0)
+                checker._finish_recheck()
+            return GLib.SOURCE_REMOVE
+
     class _IterWorker:
+        __slots__ = ("_extra_word_chars",)
+
         def __init__(self, extra_word_chars):
             self._extra_word_chars = extra_word_chars
 
@@ -261,7 +644,60 @@ class SpellChecker(GObject.Object):
                     break
 
         def sync_extra_chars(self, obj, value):
-            self._extra_word_chars = obj.extra_chars
+            # words are extended beyond the extra characters of the language as
+            # by the engine's default tokenizer
+            self._extra_word_chars = (
+                obj.extra_chars
+                + _engine.RegexTokenizer.language_extra_chars(obj.language)
+            )
+
+    class _Freeze:
+        # context manager returned by `freeze`
+        __slots__ = ("_checker",)
+
+        def __init__(self, checker):
+            self._checker = checker
+
+        def __enter__(self):
+            return self._checker
+
+        def __exit__(self, *exc_info):
+            self._checker.thaw()
+
+    class _TimedIterWorker:
+        # wraps an iter worker recording the time spent finding word boundaries
+        __slots__ = ("_worker", "_stats")
+
+        def __init__(self, worker, stats):
+            self._worker = worker
+            self._stats = stats
+
+        def _timed(self, method, loc):
+            started = time.perf_counter()
+            result = method(loc)
+            self._stats.record("tokenize", time.perf_counter() - started)
+            return result
+
+        def is_extra_word_char(self, loc):
+            return self._timed(self._worker.is_extra_word_char, loc)
+
+        def inside_word(self, loc):
+            return self._timed(self._worker.inside_word, loc)
+
+        def starts_word(self, loc):
+            return self._timed(self._worker.starts_word, loc)
+
+        def ends_word(self, loc):
+            return self._timed(self._worker.ends_word, loc)
+
+        def forward_word_end(self, loc):
+            return self._timed(self._worker.forward_word_end, loc)
+
+        def backward_word_start(self, loc):
+            return self._timed(self._worker.backward_word_start, loc)
+
+        def sync_extra_chars(self, obj, value):
+            self._worker.sync_extra_chars(obj, value)
 
     def __init__(
         self, view, language="en", prefix="gtkspellchecker", collapse=True, params=None
@@ -277,10 +713,9 @@ class SpellChecker(GObject.Object):
             self._view.connect("popup-menu", self._click_move_popup)
             self._view.connect("button-press-event", self._click_move_button)
         self._prefix = prefix
-        self._broker = enchant.Broker()
-        if params is not None:
-            for param, value in params.items():
-                self._broker.set_param(param, value)
+        self._params = params
+        self._params_key = _engine.DictionaryPool.params_key(params)
+        self._broker = SpellChecker.dictionary_pool.broker(params)
         self.languages = SpellChecker._LanguageList.from_broker(self._broker)
         if self.languages.exists(language):
             self._language = language
@@ -305,28 +740,44 @@ class SpellChecker(GObject.Object):
             else:
                 logger.critical("no dictionaries found")
                 raise NoDictionariesFound()
-        self._dictionary = self._broker.request_dict(self._language)
+        self._dictionary_finalizer = None
+        self._acquire_dictionary()
         self._deferred_check = False
-        self._filters = dict(SpellChecker.DEFAULT_FILTERS)
-        self._regexes = {
-            SpellChecker.FILTER_WORD: re.compile(
-                "|".join(self._filters[SpellChecker.FILTER_WORD])
-            ),
-            SpellChecker.FILTER_LINE: re.compile(
-                "|".join(self._filters[SpellChecker.FILTER_LINE])
-            ),
-            SpellChecker.FILTER_TEXT: re.compile(
-                "|".join(self._filters[SpellChecker.FILTER_TEXT]), re.MULTILINE
-            ),
-        }
 
         self._extra_chars = SpellChecker.DEFAULT_EXTRA_CHARS
-        self._iter_worker = SpellChecker._IterWorker(self._extra_chars)
+        self.engine = _engine.SpellingEngine(
+            self._dictionary,
+            self._extra_chars,
+            SpellChecker.DEFAULT_FILTERS,
+            (self._language, self._params_key),
+        )
+        self._iter_worker = SpellChecker._IterWorker(
+            self._extra_chars
+            + _engine.RegexTokenizer.language_extra_chars(self._language)
+        )
         self.connect("notify::extra-chars", self._iter_worker.sync_extra_chars)
 
         self._batched_rechecking = False
+        self._recheck_job = None
+        # number of threaded checks whose results have not been applied yet and
+        # whether a recheck waits for them before it is finished
+        self._threaded_checks = 0
+        self._recheck_finishing = False
+        self._recheck_priority = GLib.PRIORITY_DEFAULT_IDLE
+        self._recheck_budget = _BATCH_BUDGET_MS
+        self._bulk_checking = False
+        self._threaded_checking = False
+        self._large_insert_threshold = _LARGE_INSERT_THRESHOLD_CHARS
+        self._tokenizer = None
+        # extra characters and tokenizer finding Pango's words in snapshots
+        self._pango_tokenizer = None
+        # incremented on every buffer modification to detect stale results
+        self._generation = 0
+        self._suggestion_futures = {}
+        self._prefetch_source = None
+        self._stats = None
+        self.stats_hook = None
 
-        self._languages_menu = None
         # GTK 4-only extra menu population, gesture creation and action setup. GTK 3
         # uses signals, above.
         if not _IS_GTK3:
@@ -358,7 +809,15 @@ class SpellChecker(GObject.Object):
     def language(self, language):
         if language != self._language and self.languages.exists(language):
             self._language = language
-            self._dictionary = self._broker.request_dict(language)
+            self._acquire_dictionary()
+            self.engine.set_dictionary(self._dictionary, (language, self._params_key))
+            if self.engine.verdict_store is not None:
+                self.engine.verdict_store.register(
+                    self.engine.cache_key, self._dictionary, self._params
+                )
+            # notify is only emitted once the setter has returned, the word
+            # boundaries have to follow the language before rechecking
+            self._iter_worker.sync_extra_chars(self, None)
             self.recheck()
 
     @GObject.Property(type=bool, default=False)
@@ -378,7 +837,8 @@ class SpellChecker(GObject.Object):
     @GObject.Property(type=bool, default=False)
     def batched_rechecking(self):
         """
-        Whether to enable batched rechecking of large buffers.
+        Whether to enable batched rechecking of large buffers. Batches start
+        with the text visible in the view and proceed outward from there.
         """
         return self._batched_rechecking
 
@@ -386,6 +846,129 @@ class SpellChecker(GObject.Object):
     def batched_rechecking(self, val):
         self._batched_rechecking = val
 
+    @GObject.Property(type=int, default=GLib.PRIORITY_DEFAULT_IDLE)
+    def recheck_priority(self):
+        """
+        The GLib priority of the idle callbacks of batched rechecking.
+        """
+        return self._recheck_priority
+
+    @recheck_priority.setter
+    def recheck_priority(self, priority):
+        self._recheck_priority = priority
+
+    @GObject.Property(type=float, default=_BATCH_BUDGET_MS)
+    def recheck_budget(self):
+        """
+        The time in milliseconds batched rechecking may spend per idle callback.
+        The size of the batches adapts to the measured checking throughput.
+        """
+        return self._recheck_budget
+
+    @recheck_budget.setter
+    def recheck_budget(self, budget):
+        self._recheck_budget = budget
+
+    @GObject.Property(type=bool, default=False)
+    def bulk_checking(self):
+        """
+        Whether to split large ranges into words with the engine's tokenizer.
+
+        Large ranges are not walked word by word with GtkTextIters, instead the
+        text is fetched once, tokenized and checked by the engine, and the
+        misspelled tag is applied afterwards. By default the words of the
+        snapshot are found with Pango like :class:`PangoTokenizer` does. With
+        bulk checking, word boundaries are determined by the engine's faster
+        tokenizer instead of Pango.
+        """
+        return self._bulk_checking
+
+    @bulk_checking.setter
+    def bulk_checking(self, val):
+        self._bulk_checking = val
+
+    @GObject.Property(type=bool, default=False)
+    def threaded_checking(self):
+        """
+        Whether to check large ranges on a pool of worker threads.
+
+        Like :attr:`bulk_checking` the text of the range is checked based on a
+        snapshot, however, the dictionary lookups happen on worker threads using
+        their own dictionary handles and only the resulting tags are applied on
+        the main thread. Results which are outdated because the buffer has been
+        modified in the meantime are discarded and the range is checked again.
+        """
+        return self._threaded_checking
+
+    @threaded_checking.setter
+    def threaded_checking(self, val):
+        self._threaded_checking = val
+
+    @GObject.Property(type=int, default=_LARGE_INSERT_THRESHOLD_CHARS)
+    def large_insert_threshold(self):
+        """
+        Insertions of more characters, e.g., large pastes, are checked in idle
+        time like a batched recheck. Only the words at the boundaries of the
+        inserted text are checked right away. Zero disables this.
+        """
+        return self._large_insert_threshold
+
+    @large_insert_threshold.setter
+    def large_insert_threshold(self, threshold):
+        self._large_insert_threshold = threshold
+
+    @GObject.Property(type=object)
+    def tokenizer(self):
+        """
+        The :class:`gtkspellcheck.engine.Tokenizer` used to split the text into
+        words, e.g., a :class:`gtkspellcheck.engine.RegexTokenizer` splitting
+        identifiers for source code. If set, all ranges are checked based on
+        snapshots of their text. By default, `None`, the buffer is walked with
+        Pango's word boundaries like :class:`PangoTokenizer` does.
+        """
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, tokenizer):
+        self._tokenizer = tokenizer
+        self.engine.tokenizer = tokenizer
+        self.recheck()
+
+    @GObject.Property(type=object)
+    def verdict_store(self):
+        """
+        The :class:`gtkspellcheck.engine.VerdictStore` keeping verdicts across
+        processes, which is consulted before Enchant, or `None`, the default.
+        A store may be shared by several instances.
+        """
+        return self.engine.verdict_store
+
+    @verdict_store.setter
+    def verdict_store(self, store):
+        if store is not None:
+            store.register(self.engine.cache_key, self._dictionary, self._params)
+        self.engine.verdict_store = store
+
+    @GObject.Property(type=bool, default=False)
+    def collect_stats(self):
+        """
+        Whether to collect statistics about where the checking time goes, see
+        :meth:`get_stats`. Nothing is measured while this is disabled.
+        """
+        return self._stats is not None
+
+    @collect_stats.setter
+    def collect_stats(self, val):
+        if val and self._stats is None:
+            self._stats = Statistics()
+            self._iter_worker = SpellChecker._TimedIterWorker(
+                self._iter_worker, self._stats
+            )
+        elif not val and self._stats is not None:
+            self._stats = None
+            self._iter_worker = self._iter_worker._worker
+        self.engine.stats = self._stats
+
     @GObject.Property(type=str, default=",")
     def extra_chars(self):
         """
@@ -401,6 +984,7 @@ class SpellChecker(GObject.Object):
         :param val: String containing list of characters
         """
         self._extra_chars = chars
+        self.engine.extra_chars = chars
 
     def buffer_initialize(self):
         """
@@ -413,8 +997,21 @@ class SpellChecker(GObject.Object):
         self._buffer = self._view.get_buffer()
         self._buffer.connect("insert-text", self._before_text_insert)
         self._buffer.connect_after("insert-text", self._after_text_insert)
+        # images and widgets occupy a character each without inserting text
+        for signal in (
+            "insert-child-anchor",
+            "insert-pixbuf" if _IS_GTK3 else "insert-paintable",
+        ):
+            self._buffer.connect(signal, self._before_object_insert)
+            self._buffer.connect_after(signal, self._after_object_insert)
+        self._buffer.connect("delete-range", self._before_range_delete)
         self._buffer.connect_after("delete-range", self._range_delete)
         self._buffer.connect_after("mark-set", self._mark_set)
+        self._buffer.connect("begin-user-action", self._begin_user_action)
+        self._buffer.connect("end-user-action", self._end_user_action)
+        # nesting depth of freeze and user actions and ranges modified meanwhile
+        self._frozen = 0
+        self._dirty_ranges = []
         start = self._buffer.get_bounds()[0]
         self._marks = {
             "insert-start": SpellChecker._Mark(
@@ -433,6 +1030,15 @@ class SpellChecker(GObject.Object):
                 self._buffer, "{}-click".format(self._prefix), start, self._iter_worker
             ),
         }
+        self._text_filter_intervals = None
+        self._line_filter_cache = LRUCache(_LINE_FILTER_CACHE_SIZE)
+        # index from lowercased misspelled words to marks at the start of their
+        # occurrences and from these marks to the words and their lengths
+        self._occurrences = {}
+        self._occurrence_words = {}
+        # offsets of the words tagged as misspelled, kept up to date on edits,
+        # touching words are kept apart unlike their tags
+        self._misspellings = _engine.SpanIndex()
         self._table = self._buffer.get_tag_table()
         self._table.add(self._misspelled)
         self.ignored_tags = []
@@ -458,21 +1064,126 @@ class SpellChecker(GObject.Object):
         """
         Rechecks the spelling of the whole text.
         """
+        self._cancel_recheck()
         start, end = self._buffer.get_bounds()
+        self._clear_occurrences()
+        self._clear_dirty_ranges()
+        # text filter matches are computed once per recheck
+        self._text_filter_intervals = None
 
         if self._batched_rechecking and end.get_offset() > _BATCHING_THRESHOLD_CHARS:
-            start_mark = self._buffer.create_mark(None, start)
-            self._continue_batched_recheck(start_mark)
+            self._recheck_job = SpellChecker._RecheckJob(self, start, end)
         else:
             self.check_range(start, end, True)
+            self._finish_recheck()
+
+    def count_misspellings(self):
+        """
+        Returns the number of words tagged as misspelled.
+        """
+        return len(self._misspellings)
+
+    def next_misspelling(self, location):
+        """
+        Returns the start and end iterators of the first misspelled word starting
+        at or after the location or `None`. Pass the end of the returned word to
+        move on to the following one.
+
+        :param location: GtkTextIter to start searching at.
+        """
+        span = self._misspellings.next(location.get_offset())
+        return None if span is None else self._span_iters(span)
+
+    def previous_misspelling(self, location):
+        """
+        Returns the start and end iterators of the last misspelled word ending at
+        or before the location or `None`. Pass the start of the returned word to
+        move on to the preceding one.
+
+        :param location: GtkTextIter to start searching at.
+        """
+        span = self._misspellings.previous(location.get_offset())
+        return None if span is None else self._span_iters(span)
+
+    def misspellings(self, start=None, end=None):
+        """
+        Yields the start and end iterators of the misspelled words overlapping
+        the range, by default the whole buffer. The iterators are only valid
+        until the buffer is modified.
+
+        :param start: GtkTextIter at the start of the range.
+        :param end: GtkTextIter at the end of the range.
+        """
+        start_offset = 0 if start is None else start.get_offset()
+        end_offset = self._buffer.get_char_count() if end is None else end.get_offset()
+        for span in self._misspellings.spans(start_offset, end_offset):
+            yield self._span_iters(span)
+
+    def _span_iters(self, span):
+        return (
+            self._buffer.get_iter_at_offset(span[0]),
+            self._buffer.get_iter_at_offset(span[1]),
+        )
+
+    def get_stats(self):
+        """
+        Returns a snapshot of the statistics collected since they have been
+        enabled or reset, see :attr:`collect_stats`.
+
+        The snapshot is a dictionary with the `counters` `words.checked`,
+        `words.skipped`, `words.misspelled` and `chars.skipped` (in ignored
+        regions) and the `timings` `tokenize`, `filter.word`, `filter.line`,
+        `filter.text`, `enchant.check`, `enchant.suggest`, `tag.apply`,
+        `tag.remove` and `check_range`. Every timing has a `count`, `total_ms`,
+        `max_ms` and a `histogram` mapping upper bounds in microseconds to
+        counts.
+        """
+        if self._stats is None:
+            return {"counters": {}, "timings": {}}
+        return self._stats.snapshot()
+
+    def reset_stats(self):
+        """
+        Resets the collected statistics.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def freeze(self):
+        """
+        Suspends checking modified text until :meth:`thaw` has been called as
+        often as this method. The text modified in the meantime is checked at
+        once when thawing, with overlapping and adjacent ranges merged. User
+        actions of the buffer, i.e., edits between `begin_user_action` and
+        `end_user_action`, are treated likewise.
+
+        Returns a context manager calling :meth:`thaw` on exit::
+
+            with spellchecker.freeze():
+                buffer.set_text(text)
+        """
+        self._frozen += 1
+        return SpellChecker._Freeze(self)
+
+    def thaw(self):
+        """
+        Reverts a call to :meth:`freeze` and checks the modified text if the
+        checker is not frozen anymore.
+        """
+        if not self._frozen:
+            return
+        self._frozen -= 1
+        if not self._frozen and self._dirty_ranges:
+            self._check_dirty_ranges()
 
     def disable(self):
         """
         Disable spellchecking.
         """
         self._enabled = False
-        start, end = self._buffer.get_bounds()
-        self._buffer.remove_tag(self._misspelled, start, end)
+        self._cancel_recheck()
+        self._update_misspelled(0, self._buffer.get_char_count(), [])
+        self._clear_occurrences()
 
     def enable(self):
         """
@@ -505,15 +1216,7 @@ class SpellChecker(GObject.Object):
            multiline expressions. The regex will be compiled with the
            `re.MULTILINE` flag. Same with open end expressions apply here.
         """
-        self._filters[filter_type].append(regex)
-        if filter_type == SpellChecker.FILTER_TEXT:
-            self._regexes[filter_type] = re.compile(
-                "|".join(self._filters[filter_type]), re.MULTILINE
-            )
-        else:
-            self._regexes[filter_type] = re.compile(
-                "|".join(self._filters[filter_type])
-            )
+        self.engine.append_filter(regex, filter_type)
 
     def remove_filter(self, regex, filter_type):
         """
@@ -522,15 +1225,7 @@ class SpellChecker(GObject.Object):
         :param regex: The regex which used for filtering.
         :param filter_type: The type of the filter.
         """
-        self._filters[filter_type].remove(regex)
-        if filter_type == SpellChecker.FILTER_TEXT:
-            self._regexes[filter_type] = re.compile(
-                "|".join(self._filters[filter_type]), re.MULTILINE
-            )
-        else:
-            self._regexes[filter_type] = re.compile(
-                "|".join(self._filters[filter_type])
-            )
+        self.engine.remove_filter(regex, filter_type)
 
     def append_ignore_tag(self, tag):
         """
@@ -561,7 +1256,8 @@ class SpellChecker(GObject.Object):
         :param word: The word to add.
         """
         self._dictionary.add_to_pwl(word)
-        self.recheck()
+        self.engine.accept(word)
+        self._untag_accepted(word)
 
     def ignore_all(self, word):
         """
@@ -569,8 +1265,11 @@ class SpellChecker(GObject.Object):
 
         :param word: The word to ignore.
         """
-        self._dictionary.add_to_session(word)
-        self.recheck()
+        SpellChecker.dictionary_pool.add_to_session(self._dictionary, word)
+        if self.engine.verdict_store is not None:
+            self.engine.verdict_store.begin_session(self.engine.cache_key)
+        self.engine.accept(word)
+        self._untag_accepted(word)
 
     def check_range(self, start, end, force_all=False):
         """
@@ -579,16 +1278,35 @@ class SpellChecker(GObject.Object):
         :param start: Start iter - checking starts here.
         :param end: End iter - checking ends here.
         """
-        logger.debug(
-            "Check range called with range %d:%d to %d:%d and force all set to %s.",
-            start.get_line(),
-            start.get_line_offset(),
-            end.get_line(),
-            end.get_line_offset(),
-            force_all,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Check range called with range %d:%d to %d:%d and force all set to %s.",
+                start.get_line(),
+                start.get_line_offset(),
+                end.get_line(),
+                end.get_line_offset(),
+                force_all,
+            )
         if not self._enabled:
             return
+        stats = self._stats
+        if stats is not None:
+            started = time.perf_counter()
+        large = end.get_offset() - start.get_offset() > _BULK_CHECKING_THRESHOLD_CHARS
+        if self._tokenizer is not None:
+            if large and self._threaded_checking and self._tokenizer.thread_safe:
+                self._check_range_threaded(start, end, force_all)
+            else:
+                self._check_range_bulk(start, end, force_all)
+            return
+        if large:
+            if self._threaded_checking:
+                self._check_range_threaded(start, end, force_all)
+            else:
+                # unchanged lines of large ranges are looked up in the paragraph
+                # cache instead of being walked word by word
+                self._check_range_bulk(start, end, force_all)
+            return
         start = start.copy()
         end = end.copy()
         if self._iter_worker.inside_word(end):
@@ -598,33 +1316,373 @@ class SpellChecker(GObject.Object):
         if not self._iter_worker.starts_word(start):
             self._iter_worker.forward_word_end(start)
             self._iter_worker.backward_word_start(start)
-        self._buffer.remove_tag(self._misspelled, start, end)
         cursor = self._buffer.get_iter_at_mark(self._buffer.get_insert())
-        precursor = cursor.copy()
-        precursor.backward_char()
-        highlight = cursor.has_tag(self._misspelled) or precursor.has_tag(
-            self._misspelled
-        )
+        highlight = self._cursor_highlighted(cursor, start, end)
+        ignored = self._ignored_intervals(start, end)
+        skipped_chars = skipped = checked = misspelled = 0
+        # the misspelled words and the filter matches are collected and only the
+        # differences to the current tags are applied afterwards
+        spans = []
+        filtered = []
         word_start = start.copy()
         while word_start.compare(end) < 0:
+            span = ignored.covering(word_start.get_offset()) if ignored else None
+            if span is not None:
+                # jump to the first word starting after the ignored region
+                skipped_chars += span[1] + 1 - word_start.get_offset()
+                word_start.set_offset(span[1] + 1)
+                worker = self._iter_worker
+                if worker.inside_word(word_start) and not worker.starts_word(
+                    word_start
+                ):
+                    worker.forward_word_end(word_start)
+                if not worker.starts_word(word_start):
+                    worker.forward_word_end(word_start)
+                    worker.backward_word_start(word_start)
+                if word_start.get_offset() <= span[1]:
+                    break
+                continue
             word_end = word_start.copy()
             self._iter_worker.forward_word_end(word_end)
             in_word = (word_start.compare(cursor) < 0) and (
                 cursor.compare(word_end) <= 0
             )
+            verdict = None
             if in_word and not force_all:
                 if highlight:
-                    self._check_word(word_start, word_end)
+                    verdict = self._check_word(word_start, word_end, spans, filtered)
                 else:
                     self._deferred_check = True
             else:
-                self._check_word(word_start, word_end)
+                verdict = self._check_word(word_start, word_end, spans, filtered)
                 self._deferred_check = False
+            if verdict is None:
+                skipped += 1
+            else:
+                checked += 1
+                misspelled += verdict
             self._iter_worker.forward_word_end(word_end)
             self._iter_worker.backward_word_start(word_end)
             if word_start.equal(word_end):
                 break
             word_start = word_end.copy()
+        # the filter matches intersect the range, together they cover a single
+        # range in which the misspelled words are the only tagged spans
+        start_offset = min([start.get_offset()] + [span[0] for span in filtered])
+        end_offset = max([end.get_offset()] + [span[1] for span in spans + filtered])
+        self._update_misspelled(start_offset, end_offset, spans)
+        if skipped_chars:
+            logger.debug("Skipped %d characters in ignored regions.", skipped_chars)
+        if stats is not None:
+            self._record_range(
+                start.get_offset(),
+                end.get_offset(),
+                {
+                    "words.checked": checked,
+                    "words.skipped": skipped,
+                    "words.misspelled": misspelled,
+                    "chars.skipped": skipped_chars,
+                },
+                started,
+            )
+
+    def _ignored_intervals(self, start, end):
+        # collect the regions tagged with any ignored tag using tag toggles
+        spans = []
+        for tag in [self.no_spell_check] + self.ignored_tags:
+            if tag is None:
+                continue
+            location = start.copy()
+            if not location.has_tag(tag):
+                if (
+                    not location.forward_to_tag_toggle(tag)
+                    or location.compare(end) >= 0
+                ):
+                    continue
+            while True:
+                span_start = location.get_offset()
+                location.forward_to_tag_toggle(tag)
+                spans.append((span_start, location.get_offset() - 1))
+                if (
+                    not location.forward_to_tag_toggle(tag)
+                    or location.compare(end) >= 0
+                ):
+                    break
+        spans.sort()
+        merged = []
+        for span_start, span_end in spans:
+            if merged and span_start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], span_end))
+            else:
+                merged.append((span_start, span_end))
+        return _engine.IntervalIndex(merged)
+
+    def _snapshot_range(self, start, end):
+        # the range is extended to whole words, the line filters see the whole
+        # first and last line and their matches are excluded like text filter
+        # matches, such that long lines are not checked as a whole
+        start = start.copy()
+        end = end.copy()
+        if self._iter_worker.inside_word(end):
+            self._iter_worker.forward_word_end(end)
+        if self._iter_worker.inside_word(start) or self._iter_worker.ends_word(start):
+            self._iter_worker.backward_word_start(start)
+        offset = start.get_offset()
+        end_offset = end.get_offset()
+        # slices contain a placeholder for every non-text character, hence offsets
+        # within the slice correspond to offsets within the buffer
+        text = self._buffer.get_slice(start, end, True)
+        partial = (not start.starts_line(), not end.ends_line())
+        spans = []
+        if self.engine.has_filters(SpellChecker.FILTER_TEXT):
+            spans.extend(self._text_filter_index().slice(offset, end_offset))
+        if self.engine.has_filters(SpellChecker.FILTER_LINE):
+            lines = [location for location, cut in zip((start, end), partial) if cut]
+            if len(lines) == 2 and start.get_line() == end.get_line():
+                del lines[1]
+            for location in lines:
+                line_offset = location.get_offset() - location.get_line_offset()
+                line_spans, _cleared = self._line_filter_spans(location)
+                spans.extend(
+                    line_spans.slice(offset - line_offset, end_offset - line_offset)
+                )
+        return start, end, text, _engine.IntervalIndex(_merge_spans(spans)), partial
+
+    def _check_range_bulk(self, start, end, force_all):
+        if self._stats is not None:
+            started = time.perf_counter()
+        start, end, text, excluded, partial = self._snapshot_range(start, end)
+        counts = {}
+        misspelled = self._snapshot_engine().check_text(text, excluded, counts, partial)
+        self._apply_checked_range(start, end, text, misspelled, excluded, force_all)
+        if self._stats is not None:
+            self._record_range(
+                start.get_offset(),
+                end.get_offset(),
+                {"words." + name: value for name, value in counts.items()},
+                started,
+            )
+
+    def _check_range_threaded(self, start, end, force_all):
+        start, end, text, excluded, partial = self._snapshot_range(start, end)
+        job = SpellChecker._ThreadedCheck(
+            self._buffer,
+            start,
+            end,
+            excluded,
+            force_all,
+            self._generation,
+            self.engine,
+        )
+        future = _get_executor().submit(
+            _check_in_worker,
+            SpellChecker.dictionary_pool,
+            self.engine,
+            self._params,
+            self._language,
+            job,
+            text,
+            excluded,
+            partial,
+        )
+        self._threaded_checks += 1
+        future.add_done_callback(
+            lambda future: GLib.idle_add(self._finish_threaded_check, job, future)
+        )
+
+    def _finish_recheck(self):
+        if self._threaded_checks:
+            self._recheck_finishing = True
+        else:
+            self.emit("recheck-finished")
+
+    def _finish_threaded_check(self, job, future):
+        try:
+            self._apply_threaded_check(job, future)
+        finally:
+            # checks submitted again because the text changed meanwhile are
+            # waited for as well
+            self._threaded_checks -= 1
+        if not self._threaded_checks and self._recheck_finishing:
+            self._recheck_finishing = False
+            self.emit("recheck-finished")
+        return False
+
+    def _apply_threaded_check(self, job, future):
+        if job.buffer != self._buffer:
+            job.dispose()
+            return
+        start, end = job.iters
+        job.dispose()
+        if not self._enabled:
+            return
+        try:
+            misspelled = future.result()
+        except Exception as e:
+            logger.warning("failure checking range: {}".format(e))
+            return
+        if job.generation != self._generation or job.is_stale(self.engine):
+            # the buffer, language, dictionary or filters changed while checking,
+            # check again
+            self.check_range(start, end, job.force_all)
+            return
+        text = self._buffer.get_slice(start, end, True)
+        self._apply_checked_range(
+            start, end, text, misspelled, job.excluded, job.force_all
+        )
+        if self._stats is not None:
+            self._record_range(
+                start.get_offset(),
+                end.get_offset(),
+                {"words." + name: value for name, value in job.counts.items()},
+                job.submitted,
+            )
+
+    def _apply_checked_range(self, start, end, text, misspelled, excluded, force_all):
+        offset = start.get_offset()
+        # as in `check_range`, the filter matches overlapping the range are
+        # cleared as a whole
+        start_offset = offset
+        end_offset = end.get_offset()
+        for span_start, span_end in excluded:
+            start_offset = min(start_offset, offset + span_start)
+            end_offset = max(end_offset, offset + span_end)
+        if not force_all:
+            misspelled = self._defer_cursor_word(text, offset, misspelled)
+        ignored = [self.no_spell_check] + self.ignored_tags
+        spans = []
+        for word_start, word_end, word in misspelled:
+            location = self._buffer.get_iter_at_offset(offset + word_start)
+            if any(location.has_tag(tag) for tag in ignored):
+                continue
+            self._index_occurrence(word, location, word_end - word_start)
+            spans.append((offset + word_start, offset + word_end))
+        self._update_misspelled(start_offset, end_offset, spans)
+
+    def _snapshot_engine(self):
+        # the engine checking snapshots of the text, without a tokenizer and
+        # bulk or threaded checking it finds the words the buffer walk finds
+        if (
+            self._tokenizer is not None
+            or self._bulk_checking
+            or self._threaded_checking
+        ):
+            return self.engine
+        chars = self._extra_chars + _engine.RegexTokenizer.language_extra_chars(
+            self._language
+        )
+        if self._pango_tokenizer is None or self._pango_tokenizer[0] != chars:
+            self._pango_tokenizer = (chars, PangoTokenizer(chars))
+        return self.engine.with_tokenizer(self._pango_tokenizer[1])
+
+    def _defer_cursor_word(self, text, offset, misspelled):
+        cursor = self._buffer.get_iter_at_mark(self._buffer.get_insert())
+        highlight = self._cursor_highlighted(
+            cursor,
+            self._buffer.get_iter_at_offset(offset),
+            self._buffer.get_iter_at_offset(offset + len(text)),
+        )
+        cursor_offset = cursor.get_offset() - offset
+        deferred = False
+        if not highlight and 0 < cursor_offset <= len(text):
+            line_start = text.rfind("\n", 0, cursor_offset) + 1
+            line_end = text.find("\n", cursor_offset)
+            if line_end < 0:
+                line_end = len(text)
+            engine = self._snapshot_engine()
+            for word_start, word_end in engine.tokenize(text[line_start:line_end]):
+                word_start += line_start
+                word_end += line_start
+                if word_start < cursor_offset <= word_end:
+                    misspelled = [span for span in misspelled if span[0] != word_start]
+                    deferred = next(engine.tokenize(text[word_end:]), None) is None
+                    break
+        self._deferred_check = deferred
+        return misspelled
+
+    def _cursor_highlighted(self, cursor, start, end):
+        # whether the character at or before the cursor is tagged as misspelled
+        # outside of the range, the tags within the range are about to be replaced
+        precursor = cursor.copy()
+        precursor.backward_char()
+        for location in (cursor, precursor):
+            if location.in_range(start, end):
+                continue
+            if location.has_tag(self._misspelled):
+                return True
+        return False
+
+    def _tagged_spans(self, start_offset, end_offset):
+        # collect the spans tagged as misspelled within the range using tag
+        # toggles, the spans are clipped to the range
+        tag = self._misspelled
+        spans = []
+        location = self._buffer.get_iter_at_offset(start_offset)
+        while location.get_offset() < end_offset:
+            if not location.has_tag(tag):
+                if (
+                    not location.forward_to_tag_toggle(tag)
+                    or location.get_offset() >= end_offset
+                ):
+                    break
+            span_start = location.get_offset()
+            location.forward_to_tag_toggle(tag)
+            spans.append((span_start, min(location.get_offset(), end_offset)))
+        return spans
+
+    def _update_misspelled(self, start_offset, end_offset, spans):
+        # makes the sorted spans of words the only ones tagged as misspelled
+        # within the range, adjacent words are only coalesced for tagging and
+        # only the spans whose tags actually change are touched such that an
+        # unchanged range causes neither signals nor relayouts
+        removed, added = self._misspellings.replace(start_offset, end_offset, spans)
+        if removed and self._occurrence_words:
+            self._forget_untagged_occurrences(removed, added)
+        merged = _merge_spans(spans)
+        current = self._tagged_spans(start_offset, end_offset)
+        if current != merged:
+            get_iter = self._buffer.get_iter_at_offset
+            for span_start, span_end in _subtract_spans(current, merged):
+                self._untag_misspelled(get_iter(span_start), get_iter(span_end))
+            for span_start, span_end in _subtract_spans(merged, current):
+                self._tag_misspelled(get_iter(span_start), get_iter(span_end))
+        for span_start, span_end in removed:
+            self.emit("misspelling-removed", span_start, span_end)
+        for span_start, span_end in added:
+            self.emit("misspelling-added", span_start, span_end)
+
+    def _tag_misspelled(self, start, end):
+        stats = self._stats
+        if stats is None:
+            self._buffer.apply_tag(self._misspelled, start, end)
+            return
+        started = time.perf_counter()
+        self._buffer.apply_tag(self._misspelled, start, end)
+        stats.record("tag.apply", time.perf_counter() - started)
+
+    def _untag_misspelled(self, start, end):
+        stats = self._stats
+        if stats is None:
+            self._buffer.remove_tag(self._misspelled, start, end)
+            return
+        started = time.perf_counter()
+        self._buffer.remove_tag(self._misspelled, start, end)
+        stats.record("tag.remove", time.perf_counter() - started)
+
+    def _record_range(self, start_offset, end_offset, counts, started):
+        # adds the numbers of a checked range to the statistics and reports them
+        # to the hook
+        duration = time.perf_counter() - started
+        stats = self._stats
+        stats.record("check_range", duration)
+        for name, value in counts.items():
+            stats.count(name, value)
+        if self.stats_hook is not None:
+            report = dict(counts)
+            report.update(
+                start=start_offset, end=end_offset, duration_ms=duration * 1000
+            )
+            self.stats_hook(report)
 
     def populate_menu(self, menu):
         """
@@ -650,38 +1708,38 @@ class SpellChecker(GObject.Object):
         else:
             menu.append_item(self._get_languages_menu())
 
-        if self._marks["click"].inside_word:
-            start, end = self._marks["click"].word
-            if start.has_tag(self._misspelled):
-                word = self._buffer.get_text(start, end, False)
-                items = self._suggestion_menu(word)
-                if self.collapse:
-                    menu_label = _("Suggestions")
+        span = self._misspelled_span(self._marks["click"].iter)
+        if span is not None:
+            start, end = span
+            word = self._buffer.get_text(start, end, False)
+            items = self._suggestion_menu(word)
+            if self.collapse:
+                menu_label = _("Suggestions")
+                if _IS_GTK3:
+                    suggestions = Gtk.MenuItem.new_with_label(menu_label)
+                    submenu = Gtk.Menu.new()
+                else:
+                    suggestions = Gio.MenuItem.new(menu_label, None)
+                    submenu = Gio.Menu.new()
+                for item in items:
                     if _IS_GTK3:
-                        suggestions = Gtk.MenuItem.new_with_label(menu_label)
-                        submenu = Gtk.Menu.new()
+                        submenu.append(item)
                     else:
-                        suggestions = Gio.MenuItem.new(menu_label, None)
-                        submenu = Gio.Menu.new()
-                    for item in items:
-                        if _IS_GTK3:
-                            submenu.append(item)
-                        else:
-                            submenu.append_item(item)
-                    suggestions.set_submenu(submenu)
+                        submenu.append_item(item)
+                suggestions.set_submenu(submenu)
+                if _IS_GTK3:
+                    suggestions.show_all()
+                    menu.prepend(suggestions)
+                else:
+                    menu.prepend_item(suggestions)
+            else:
+                items.reverse()
+                for item in items:
                     if _IS_GTK3:
-                        suggestions.show_all()
-                        menu.prepend(suggestions)
+                        menu.prepend(item)
+                        menu.show_all()
                     else:
-                        menu.prepend_item(suggestions)
-                else:
-                    items.reverse()
-                    for item in items:
-                        if _IS_GTK3:
-                            menu.prepend(item)
-                            menu.show_all()
-                        else:
-                            menu.prepend_item(item)
+                        menu.prepend_item(item)
 
     def move_click_mark(self, iter):
         """
@@ -690,6 +1748,7 @@ class SpellChecker(GObject.Object):
         :param iter: TextIter for the new location
         """
         self._marks["click"].move(iter)
+        self._schedule_prefetch()
 
     def _gtk4_setup_actions(self) -> None:
         action_group = Gio.SimpleActionGroup.new()
@@ -722,9 +1781,13 @@ class SpellChecker(GObject.Object):
         if _IS_GTK3:
             return self._build_languages_menu()
         else:
-            if self._languages_menu is None:
-                self._languages_menu = self._build_languages_menu()
-            return self._languages_menu
+            # the model only refers to the language action of the view and is hence
+            # shared by all instances with the same languages
+            key = self.languages._codes
+            menu = SpellChecker._languages_menus.get(key)
+            if menu is None:
+                menu = SpellChecker._languages_menus[key] = self._build_languages_menu()
+            return menu
 
     def _build_languages_menu(self):
         if _IS_GTK3:
@@ -761,41 +1824,25 @@ class SpellChecker(GObject.Object):
 
     def _suggestion_menu(self, word):
         menu = []
-        suggestions = self._dictionary.suggest(word)
-        if not suggestions:
-            # Show GTK 3 no suggestions item (removed for GTK 4)
-            if _IS_GTK3:
-                item = Gtk.MenuItem.new()
-                label = Gtk.Label.new("")
-                try:
-                    label.set_halign(Gtk.Align.LEFT)
-                except AttributeError:
-                    label.set_alignment(0.0, 0.5)
-                label.set_markup("<i>{text}</i>".format(text=_("(no suggestions)")))
-                item.add(label)
-                menu.append(item)
+        suggestions = self._get_suggestions(word)
+        if _IS_GTK3:
+            if suggestions is None:
+                # replaced as soon as the suggestions are available
+                placeholder = self._label_menu_item(
+                    "<i>{text}</i>".format(text=_("(loading suggestions)"))
+                )
+                self._when_suggested(word, placeholder)
+                menu.append(placeholder)
+            else:
+                menu.extend(self._suggestion_items(word, suggestions))
         else:
-            for suggestion in suggestions:
-                if _IS_GTK3:
-                    item = Gtk.MenuItem.new()
-                    label = Gtk.Label.new("")
-                    label.set_markup("<b>{text}</b>".format(text=suggestion))
-                    try:
-                        label.set_halign(Gtk.Align.LEFT)
-                    except AttributeError:
-                        label.set_alignment(0.0, 0.5)
-                    item.add(label)
-
-                    def _make_on_activate(word):
-                        return lambda *args: self._replace_word(word)
-
-                    item.connect("activate", _make_on_activate(word))
-                else:
-                    escaped = suggestion.replace("'", "\\'")
-                    item = Gio.MenuItem.new(
-                        suggestion, f"spelling.replace-word('{escaped}')"
-                    )
-                menu.append(item)
+            section = Gio.Menu.new()
+            if suggestions is None:
+                self._when_suggested(word, section)
+            else:
+                for item in self._suggestion_items(word, suggestions):
+                    section.append_item(item)
+            menu.append(Gio.MenuItem.new_section(None, section))
         add_to_dict_menu_label = _("Add to Dictionary")
         word_escaped = word.replace("'", "\\'")
         if _IS_GTK3:
@@ -818,6 +1865,150 @@ class SpellChecker(GObject.Object):
         menu.append(item)
         return menu
 
+    def _suggestion_items(self, word, suggestions):
+        items = []
+        if not suggestions:
+            # Show GTK 3 no suggestions item (removed for GTK 4)
+            if _IS_GTK3:
+                items.append(
+                    self._label_menu_item(
+                        "<i>{text}</i>".format(text=_("(no suggestions)"))
+                    )
+                )
+        else:
+            for suggestion in suggestions:
+                if _IS_GTK3:
+                    item = self._label_menu_item(
+                        "<b>{text}</b>".format(text=GLib.markup_escape_text(suggestion))
+                    )
+
+                    def _make_on_activate(suggestion):
+                        return lambda *args: self._replace_word(suggestion)
+
+                    item.connect("activate", _make_on_activate(suggestion))
+                else:
+                    escaped = suggestion.replace("'", "\\'")
+                    item = Gio.MenuItem.new(
+                        suggestion, f"spelling.replace-word('{escaped}')"
+                    )
+                items.append(item)
+        return items
+
+    def _label_menu_item(self, markup):
+        item = Gtk.MenuItem.new()
+        label = Gtk.Label.new("")
+        try:
+            label.set_halign(Gtk.Align.LEFT)
+        except AttributeError:
+            label.set_alignment(0.0, 0.5)
+        label.set_markup(markup)
+        item.add(label)
+        return item
+
+    def _get_suggestions(self, word):
+        suggestions = self.engine.cached_suggestions(word)
+        if suggestions is None:
+            try:
+                suggestions = self._request_suggestions(word).result(
+                    _SUGGESTION_WAIT_SECONDS
+                )
+            except concurrent.futures.TimeoutError:
+                return None
+            except _engine.enchant().Error as e:
+                logger.warning("failure getting suggestions: {}".format(e))
+                return []
+        return suggestions
+
+    def _request_suggestions(self, word):
+        key = self.engine.verdict_key(word)
+        future = self._suggestion_futures.get(key)
+        if future is None:
+            future = _get_suggestion_executor().submit(
+                _suggest_in_worker,
+                SpellChecker.dictionary_pool,
+                self.engine,
+                self._params,
+                self._language,
+                key[0],
+                word,
+            )
+            self._suggestion_futures[key] = future
+            future.add_done_callback(
+                lambda future: GLib.idle_add(self._forget_suggestion_future, key)
+            )
+        return future
+
+    def _forget_suggestion_future(self, key):
+        self._suggestion_futures.pop(key, None)
+        return False
+
+    def _when_suggested(self, word, target):
+        self._request_suggestions(word).add_done_callback(
+            lambda future: GLib.idle_add(self._fill_suggestions, word, target, future)
+        )
+
+    def _fill_suggestions(self, word, target, future):
+        try:
+            suggestions = future.result()
+        except _engine.enchant().Error as e:
+            logger.warning("failure getting suggestions: {}".format(e))
+            suggestions = []
+        items = self._suggestion_items(word, suggestions)
+        if _IS_GTK3:
+            parent = target.get_parent()
+            if parent is None:
+                # the menu has been closed in the meantime
+                return False
+            position = parent.get_children().index(target)
+            parent.remove(target)
+            for item in items:
+                parent.insert(item, position)
+                item.show_all()
+                position += 1
+        else:
+            for item in items:
+                target.append_item(item)
+        return False
+
+    def _schedule_prefetch(self):
+        if self._prefetch_source is None:
+            self._prefetch_source = GLib.idle_add(
+                self._prefetch_suggestions, priority=GLib.PRIORITY_LOW
+            )
+
+    def _prefetch_suggestions(self):
+        self._prefetch_source = None
+        if not self._enabled:
+            return False
+        locations = [
+            self._buffer.get_iter_at_mark(self._buffer.get_insert()),
+            self._marks["click"].iter,
+        ]
+        for location in locations:
+            for word in self._misspellings_near(location):
+                if self.engine.cached_suggestions(word) is None:
+                    self._request_suggestions(word)
+        return False
+
+    def _misspellings_near(self, location):
+        start = location.copy()
+        start.backward_lines(_PREFETCH_LINES)
+        end = location.copy()
+        end.forward_lines(_PREFETCH_LINES)
+        end.forward_to_line_end()
+        offset = location.get_offset()
+        words = []
+        for span in self._misspellings.spans(start.get_offset(), end.get_offset()):
+            word_start, word_end = self._span_iters(span)
+            words.append(
+                (
+                    abs(span[0] - offset),
+                    self._buffer.get_text(word_start, word_end, False),
+                )
+            )
+        words.sort()
+        return [word for _distance, word in words[:_PREFETCH_WORDS]]
+
     def _click_move_popup(self, *args):
         self.move_click_mark(self._buffer.get_iter_at_mark(self._buffer.get_insert()))
         return False
@@ -844,22 +2035,132 @@ class SpellChecker(GObject.Object):
         self.populate_menu(self._spelling_menu)
 
     def _before_text_insert(self, textbuffer, location, text, length):
+        self._generation += 1
         self._marks["insert-start"].move(location)
 
     def _after_text_insert(self, textbuffer, location, text, length):
+        self._after_insert(location, len(text))
+
+    def _before_object_insert(self, textbuffer, location, obj):
+        self._before_text_insert(textbuffer, location, None, 1)
+
+    def _after_object_insert(self, textbuffer, location, obj):
+        end = self._marks["insert-start"].iter
+        end.forward_char()
+        self._after_insert(end, 1)
+
+    def _after_insert(self, location, length):
+        # shifts the offset indexes by the number of inserted characters and
+        # checks the modified range
         start = self._marks["insert-start"].iter
-        self.check_range(start, location)
+        if self._text_filter_intervals is not None:
+            self._text_filter_intervals[1].shift(start.get_offset(), length)
+        self._misspellings.shift(start.get_offset(), length)
+        if self._frozen:
+            self._add_dirty_range(start, location)
+        else:
+            self._check_modified_range(start, location)
         self._marks["insert-end"].move(location)
 
+    def _check_modified_range(self, start, end):
+        if self._text_filter_intervals is not None:
+            self._update_text_filter_index(start, end)
+        size = end.get_offset() - start.get_offset()
+        if self._enabled and 0 < self._large_insert_threshold < size:
+            self._queue_range(start, end)
+        else:
+            self.check_range(start, end)
+
+    def _queue_range(self, start, end):
+        # the range is checked in idle time, only the words at its boundaries,
+        # which may have been joined with the surrounding text, are checked now
+        self._update_misspelled(start.get_offset(), end.get_offset(), [])
+        if self._recheck_job is None:
+            self._recheck_job = SpellChecker._RecheckJob(self, start, end, False)
+        else:
+            self._recheck_job.add(start, end)
+        self.check_range(start, start)
+        self.check_range(end, end)
+
+    def _before_range_delete(self, textbuffer, start, end):
+        if self._text_filter_intervals is not None:
+            self._text_filter_intervals[1].shift(
+                start.get_offset(), start.get_offset() - end.get_offset()
+            )
+        self._forget_occurrences(start, end)
+        removed = self._misspellings.shift(
+            start.get_offset(), start.get_offset() - end.get_offset()
+        )
+        for span_start, span_end in removed:
+            self.emit("misspelling-removed", span_start, span_end)
+
     def _range_delete(self, textbuffer, start, end):
-        self.check_range(start, end)
+        self._generation += 1
+        if self._frozen:
+            self._add_dirty_range(start, end)
+        else:
+            self._check_modified_range(start, end)
+
+    def _begin_user_action(self, textbuffer):
+        self.freeze()
+
+    def _end_user_action(self, textbuffer):
+        self.thaw()
+
+    def _add_dirty_range(self, start, end):
+        self._dirty_ranges.append(
+            (
+                self._buffer.create_mark(None, start, True),
+                self._buffer.create_mark(None, end, False),
+            )
+        )
+
+    def _clear_dirty_ranges(self):
+        ranges = []
+        for start_mark, end_mark in self._dirty_ranges:
+            ranges.append(
+                (
+                    self._buffer.get_iter_at_mark(start_mark).get_offset(),
+                    self._buffer.get_iter_at_mark(end_mark).get_offset(),
+                )
+            )
+            self._buffer.delete_mark(start_mark)
+            self._buffer.delete_mark(end_mark)
+        self._dirty_ranges = []
+        return ranges
+
+    def _check_dirty_ranges(self):
+        # the ranges modified while frozen are merged and each is checked once
+        merged = []
+        for start_offset, end_offset in sorted(self._clear_dirty_ranges()):
+            if merged and start_offset <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end_offset))
+            else:
+                merged.append((start_offset, end_offset))
+        for start_offset, end_offset in merged:
+            # checking invalidates iters, hence they are obtained for every range
+            self._check_modified_range(
+                self._buffer.get_iter_at_offset(start_offset),
+                self._buffer.get_iter_at_offset(end_offset),
+            )
 
     def _mark_set(self, textbuffer, location, mark):
-        if mark == self._buffer.get_insert() and self._deferred_check:
-            self._check_deferred_range(False)
+        if mark == self._buffer.get_insert():
+            if self._deferred_check:
+                self._check_deferred_range(False)
+            self._schedule_prefetch()
+
+    def _misspelled_span(self, location):
+        # returns the iters of the misspelled word containing the location or
+        # ending at it, as it was tokenized when checked
+        span = self._misspellings.at(location.get_offset())
+        return None if span is None else self._span_iters(span)
 
     def _replace_word(self, new_word):
-        start, end = self._marks["click"].word
+        span = self._misspelled_span(self._marks["click"].iter)
+        if span is None:
+            return
+        start, end = span
         old_word = start.get_text(end)
         offset = start.get_offset()
         self._buffer.begin_user_action()
@@ -867,93 +2168,301 @@ class SpellChecker(GObject.Object):
         self._buffer.insert(self._buffer.get_iter_at_offset(offset), new_word)
         self._buffer.end_user_action()
         self._dictionary.store_replacement(old_word, new_word)
+        # the stored replacement changes the suggestions for the old word
+        _engine.suggestion_cache.discard(self.engine.verdict_key(old_word))
+
+    def _acquire_dictionary(self):
+        # the dictionary is given back to the pool when the language changes or
+        # the instance is garbage collected
+        if self._dictionary_finalizer is not None:
+            self._dictionary_finalizer()
+        pool = SpellChecker.dictionary_pool
+        self._dictionary = pool.acquire(self._language, self._params)
+        self._dictionary_finalizer = weakref.finalize(
+            self, pool.release, self._dictionary
+        )
 
     def _check_deferred_range(self, force_all):
         start = self._marks["insert-start"].iter
         end = self._marks["insert-end"].iter
         self.check_range(start, end, force_all)
 
-    def _check_word(self, start, end):
-        if start.has_tag(self.no_spell_check):
-            return
-        for tag in self.ignored_tags:
-            if start.has_tag(tag):
-                return
+    def _check_word(self, start, end, spans, filtered):
+        # returns whether the word is misspelled or `None` if it has been skipped,
+        # the offsets of a misspelled word are appended to `spans` and those of
+        # the filter match covering a skipped word to `filtered`
         word = self._buffer.get_text(start, end, False).strip()
-        logger.debug(
-            "Checking word %s in range %d:%d to %d:%d.",
-            word,
-            start.get_line(),
-            start.get_line_offset(),
-            end.get_line(),
-            end.get_line_offset(),
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Checking word %s in range %d:%d to %d:%d.",
+                word,
+                start.get_line(),
+                start.get_line_offset(),
+                end.get_line(),
+                end.get_line_offset(),
+            )
         if not word:
-            return
-        if len(self._filters[SpellChecker.FILTER_WORD]):
-            if self._regexes[SpellChecker.FILTER_WORD].match(word):
-                return
-        if len(self._filters[SpellChecker.FILTER_LINE]):
+            return None
+        if self.engine.is_filtered_word(word):
+            return None
+        if self.engine.has_filters(SpellChecker.FILTER_LINE):
+            line_spans, cleared = self._line_filter_spans(start)
+            span = line_spans.covering(start.get_line_offset())
+            if span is not None:
+                if span in cleared:
+                    return None
+                cleared.add(span)
+                if _IS_GTK3:
+                    start = self._buffer.get_iter_at_line_offset(
+                        start.get_line(), span[0]
+                    )
+                    end = self._buffer.get_iter_at_line_offset(
+                        start.get_line(), span[1]
+                    )
+                else:
+                    # Success is not verified here as the locations come directly
+                    # from the buffer
+                    _success, start = self._buffer.get_iter_at_line_offset(
+                        start.get_line(), span[0]
+                    )
+                    _success, end = self._buffer.get_iter_at_line_offset(
+                        start.get_line(), span[1]
+                    )
+                filtered.append((start.get_offset(), end.get_offset()))
+                return None
+        if self.engine.has_filters(SpellChecker.FILTER_TEXT):
+            span = self._text_filter_index().covering(start.get_offset())
+            if span is not None:
+                filtered.append(span)
+                return None
+        try:
+            correct = self.engine.is_correct(word)
+        except _engine.enchant().Error as e:
+            logger.warning("failure checking word: {}".format(e))
+            return False
+        if not correct:
+            spans.append((start.get_offset(), end.get_offset()))
+            self._index_occurrence(word, start, end.get_offset() - start.get_offset())
+        return not correct
+
+    def _index_occurrence(self, word, start, length):
+        indexed = False
+        for mark in start.get_marks():
+            other = self._occurrence_words.get(mark)
+            if other is None:
+                continue
+            if other == (word, length) and not indexed:
+                indexed = True
+            else:
+                self._forget_occurrence(mark)
+        if not indexed:
+            mark = self._buffer.create_mark(None, start, False)
+            self._occurrence_words[mark] = (word, length)
+            self._occurrences.setdefault(word.lower(), set()).add(mark)
+
+    def _forget_occurrence(self, mark):
+        word, _length = self._occurrence_words.pop(mark)
+        folded = word.lower()
+        marks = self._occurrences[folded]
+        marks.discard(mark)
+        if not marks:
+            del self._occurrences[folded]
+        self._buffer.delete_mark(mark)
+
+    def _forget_untagged_occurrences(self, removed, added):
+        # forgets the occurrences of the words which are not tagged anymore,
+        # unless another misspelled word has taken their place
+        starts = {span_start for span_start, _span_end in added}
+        location = self._buffer.get_start_iter()
+        for span_start, _span_end in removed:
+            if span_start in starts:
+                continue
+            location.set_offset(span_start)
+            for mark in location.get_marks():
+                if mark in self._occurrence_words:
+                    self._forget_occurrence(mark)
+
+    def _forget_occurrences(self, start, end):
+        # forgets the occurrences starting within the range, these start within
+        # the misspelled spans and only their characters are searched for marks
+        start_offset = start.get_offset()
+        end_offset = end.get_offset()
+        location = start.copy()
+        for span_start, span_end in self._misspellings.spans(start_offset, end_offset):
+            for offset in range(
+                max(span_start, start_offset), min(span_end, end_offset)
+            ):
+                location.set_offset(offset)
+                for mark in location.get_marks():
+                    if mark in self._occurrence_words:
+                        self._forget_occurrence(mark)
+
+    def _clear_occurrences(self):
+        for mark in self._occurrence_words:
+            if not mark.get_deleted():
+                self._buffer.delete_mark(mark)
+        self._occurrences.clear()
+        self._occurrence_words.clear()
+
+    def _untag_accepted(self, word):
+        # accepting a word may also accept its case variants (e.g. capitalized)
+        marks = self._occurrences.get(word.lower(), ())
+        candidates = {self._occurrence_words[mark][0] for mark in marks}
+        for candidate in candidates:
+            if candidate != word:
+                self.engine.forget(candidate)
+                try:
+                    if not self.engine.is_correct(candidate):
+                        continue
+                except _engine.enchant().Error as e:
+                    logger.warning("failure checking word: {}".format(e))
+                    continue
+            self._untag_occurrences(candidate)
+
+    def _untag_occurrences(self, word):
+        for mark in list(self._occurrences.get(word.lower(), ())):
+            # the occurrence ends where it ended when it was checked, word
+            # boundaries of the tokenizer may differ from Pango's
+            other, length = self._occurrence_words[mark]
+            if other != word:
+                continue
+            start = self._buffer.get_iter_at_mark(mark)
+            end = start.copy()
+            end.forward_chars(length)
+            self._forget_occurrence(mark)
+            if self._buffer.get_text(start, end, False).strip() == word:
+                self._update_misspelled(start.get_offset(), end.get_offset(), [])
+
+    def _visible_range(self):
+        rect = self._view.get_visible_rect()
+        if rect.width <= 0 or rect.height <= 0:
+            return None
+        start = self._view.get_iter_at_location(rect.x, rect.y)
+        end = self._view.get_iter_at_location(rect.x + rect.width, rect.y + rect.height)
+        if isinstance(start, tuple):
+            start = start[1]
+        if isinstance(end, tuple):
+            end = end[1]
+        start.backward_lines(_VISIBLE_MARGIN_LINES)
+        end.forward_lines(_VISIBLE_MARGIN_LINES)
+        return start, end
+
+    def _line_filter_spans(self, location):
+        # line filter matches are cached per line until the buffer is modified,
+        # together with the matches the misspelled tag has been removed from
+        line_number = location.get_line()
+        key = (line_number, self._generation, self.engine.filter_generation)
+        entry = self._line_filter_cache.get(key)
+        if entry is None:
             if _IS_GTK3:
-                line_start = self._buffer.get_iter_at_line(start.get_line())
+                line_start = self._buffer.get_iter_at_line(line_number)
             else:
-                _success, line_start = self._buffer.get_iter_at_line(start.get_line())
-            line_end = end.copy()
+                _success, line_start = self._buffer.get_iter_at_line(line_number)
+            line_end = location.copy()
             line_end.forward_to_line_end()
-            line = self._buffer.get_text(line_start, line_end, False)
-            for match in self._regexes[SpellChecker.FILTER_LINE].finditer(line):
-                if match.start() <= start.get_line_offset() <= match.end():
-                    if _IS_GTK3:
-                        start = self._buffer.get_iter_at_line_offset(
-                            start.get_line(), match.start()
-                        )
-                        end = self._buffer.get_iter_at_line_offset(
-                            start.get_line(), match.end()
-                        )
-                    else:
-                        # Success is not verified here as the locations come directly
-                        # from the buffer
-                        _success, start = self._buffer.get_iter_at_line_offset(
-                            start.get_line(), match.start()
-                        )
-                        _success, end = self._buffer.get_iter_at_line_offset(
-                            start.get_line(), match.end()
-                        )
-                    self._buffer.remove_tag(self._misspelled, start, end)
-                    return
-        if len(self._filters[SpellChecker.FILTER_TEXT]):
-            text_start, text_end = self._buffer.get_bounds()
-            text = self._buffer.get_text(text_start, text_end, False)
-            for match in self._regexes[SpellChecker.FILTER_TEXT].finditer(text):
-                if match.start() <= start.get_offset() <= match.end():
-                    start = self._buffer.get_iter_at_offset(match.start())
-                    end = self._buffer.get_iter_at_offset(match.end())
-                    self._buffer.remove_tag(self._misspelled, start, end)
-                    return
-        try:
-            correct = self._dictionary.check(word)
-        except enchant.Error as e:
-            logger.warning("failure checking word: {}".format(e))
-        else:
-            if not correct:
-                self._buffer.apply_tag(self._misspelled, start, end)
+            # like line offsets, slices count non-text characters
+            line = self._buffer.get_slice(line_start, line_end, True)
+            entry = (
+                _engine.IntervalIndex(
+                    self.engine.filter_spans(SpellChecker.FILTER_LINE, line)
+                ),
+                set(),
+            )
+            self._line_filter_cache.put(key, entry)
+        return entry
+
+    def _text_filter_index(self):
+        # the index is rebuilt if the filters have changed since it was built
+        generation = self.engine.filter_generation
+        if (
+            self._text_filter_intervals is None
+            or self._text_filter_intervals[0] != generation
+        ):
+            start, end = self._buffer.get_bounds()
+            spans = self.engine.filter_spans(
+                SpellChecker.FILTER_TEXT, self._buffer.get_slice(start, end, True)
+            )
+            self._text_filter_intervals = (generation, _engine.IntervalIndex(spans))
+        return self._text_filter_intervals[1]
+
+    def _update_text_filter_index(self, start, end):
+        # rescan the modified lines including matches overlapping them, a new
+        # match may start anywhere after the previous match such that the scan
+        # resumes where the previous match ends, as a scan of the whole buffer
+        # would, and that match is assumed to be unaffected
+        index = self._text_filter_intervals[1]
+        start = start.copy()
+        start.set_line_offset(0)
+        end = end.copy()
+        if not end.ends_line():
+            end.forward_to_line_end()
+        modified_start, scan_end = index.extent(start.get_offset(), end.get_offset())
+        previous = index.previous(modified_start)
+        scan_start = 0 if previous is None else previous[1]
+        text_end = self._buffer.get_iter_at_offset(
+            scan_end + max(_TEXT_FILTER_SLACK_CHARS, scan_end - modified_start)
+        )
+        text = self._buffer.get_slice(
+            self._buffer.get_iter_at_offset(scan_start), text_end, True
+        )
+        spans = self.engine.filter_spans(
+            SpellChecker.FILTER_TEXT, text, 0, scan_end - scan_start
+        )
+        index.replace(
+            scan_start,
+            scan_end,
+            [
+                (span_start + scan_start, span_end + scan_start)
+                for span_start, span_end in spans
+            ],
+        )
 
-    def _continue_batched_recheck(self, start_mark):
-        if start_mark.get_buffer() != self._buffer:
-            return
-        start = self._buffer.get_iter_at_mark(start_mark)
-        self._buffer.delete_mark(start_mark)
+    def _cancel_recheck(self):
+        if self._recheck_job is not None:
+            self._recheck_job.cancel()
+            self._recheck_job = None
+        self._recheck_finishing = False
 
-        if not self._enabled:
-            return
 
-        end = start.copy()
-        end.forward_chars(_BATCH_SIZE_CHARS)
-        self._iter_worker.forward_word_end(end)
+class PangoTokenizer(_engine.Tokenizer):
+    """
+    Tokenizer finding the words the checker finds when walking its buffer by
+    default, i.e., Pango's words extended across extra characters. It uses a
+    GtkTextBuffer of its own and may only be used on the main thread.
 
-        self.check_range(start, end, True)
+    :param extra_chars: Extra characters beyond which words are extended.
+    """
 
-        if not end.is_end():
-            end.forward_char()
-            start_mark = self._buffer.create_mark(None, end)
-            GLib.idle_add(self._continue_batched_recheck, start_mark)
+    thread_safe = False
+
+    def __init__(self, extra_chars=SpellChecker.DEFAULT_EXTRA_CHARS):
+        self._extra_chars = extra_chars
+        self._buffer = Gtk.TextBuffer()
+        self._iter_worker = SpellChecker._IterWorker(extra_chars)
+
+    @property
+    def cache_key(self):
+        return type(self), self._extra_chars
+
+    def tokenize(self, text):
+        # follows the loop of `SpellChecker.check_range`
+        self._buffer.set_text(text)
+        worker = self._iter_worker
+        word_start, end = self._buffer.get_bounds()
+        if not worker.starts_word(word_start):
+            worker.forward_word_end(word_start)
+            worker.backward_word_start(word_start)
+        spans = []
+        while word_start.compare(end) < 0:
+            word_end = word_start.copy()
+            worker.forward_word_end(word_end)
+            span = (word_start.get_offset(), word_end.get_offset())
+            if text[span[0] : span[1]].strip():
+                spans.append(span)
+            worker.forward_word_end(word_end)
+            worker.backward_word_start(word_end)
+            if word_start.equal(word_end):
+                break
+            word_start = word_end.copy()
+        # the spans are collected first as the buffer is reused by the next call
+        return iter(spans)
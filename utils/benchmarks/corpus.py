@@ -0,0 +1,140 @@
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Synthetic corpora for the benchmarks. The words of the documents are generated
+from syllables and written as a Hunspell dictionary, such that the benchmarks
+neither depend on the installed dictionaries nor on real language text.
+"""
+
+import os
+import random
+
+_SYLLABLES = (
+    "ba be bi bo bu da de di do du fa fe fi fo fu ka ke ki ko ku la le li lo lu "
+    "ma me mi mo mu na ne ni no nu pa pe pi po pu ra re ri ro ru sa se si so su "
+    "ta te ti to tu va ve vi vo vu an en in on un ar er ir or ur"
+).split()
+
+_TLDS = ("org", "com", "net", "io")
+
+
+def generate_words(count, seed=0):
+    """
+    Return a sorted list of `count` distinct words made of two to four syllables.
+
+    :param count: Number of words.
+    :param seed: Seed of the random generator.
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def write_dictionary(directory, language, words):
+    """
+    Write the words as Hunspell dictionary for the language into the `hunspell`
+    and `myspell` subdirectories of the directory. Enchant finds it there if
+    `ENCHANT_CONFIG_DIR` points to the directory.
+
+    :param directory: Enchant configuration directory.
+    :param language: Language code of the dictionary, e.g., `xx_XX`.
+    :param words: Words of the dictionary.
+    """
+    for provider in ("hunspell", "myspell"):
+        path = os.path.join(directory, provider)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, language + ".aff"), "w", encoding="utf-8") as aff:
+            aff.write("SET UTF-8\nTRY {}\n".format("aeioubdfklmnprstv"))
+        with open(os.path.join(path, language + ".dic"), "w", encoding="utf-8") as dic:
+            dic.write("{}\n".format(len(words)))
+            for word in words:
+                dic.write(word + "\n")
+
+
+def misspell(word, known, rng):
+    """
+    Return a variation of the word which is not a known word.
+    """
+    while True:
+        position = rng.randrange(len(word) + 1)
+        candidate = word[:position] + rng.choice("qxzwy") + word[position:]
+        if candidate not in known:
+            return candidate
+
+
+def generate_document(
+    words,
+    size,
+    misspelling_rate=0.05,
+    url_rate=0.01,
+    email_rate=0.01,
+    line_length=12,
+    seed=0,
+):
+    """
+    Generate a document made of sentences of dictionary words.
+
+    :param words: Dictionary words the document is made of.
+    :param size: Number of tokens of the document.
+    :param misspelling_rate: Fraction of tokens which are misspelled words.
+    :param url_rate: Fraction of tokens which are URLs.
+    :param email_rate: Fraction of tokens which are email addresses.
+    :param line_length: Number of tokens per line, paragraphs are separated by
+        empty lines every ten lines.
+    :param seed: Seed of the random generator.
+    """
+    rng = random.Random(seed)
+    known = frozenset(words)
+    lines = []
+    line = []
+    sentence_start = True
+    for _ in range(size):
+        choice = rng.random()
+        if choice < url_rate:
+            token = "https://{}.{}/{}".format(
+                rng.choice(words), rng.choice(_TLDS), rng.choice(words)
+            )
+        elif choice < url_rate + email_rate:
+            token = "{}@{}.{}".format(
+                rng.choice(words), rng.choice(words), rng.choice(_TLDS)
+            )
+        else:
+            token = rng.choice(words)
+            if choice < url_rate + email_rate + misspelling_rate:
+                token = misspell(token, known, rng)
+            if sentence_start:
+                token = token.capitalize()
+        sentence_start = False
+        punctuation = rng.random()
+        if punctuation < 0.08:
+            token += "."
+            sentence_start = True
+        elif punctuation < 0.15:
+            token += ","
+        line.append(token)
+        if len(line) >= line_length:
+            lines.append(" ".join(line))
+            line = []
+            if len(lines) % 11 == 10:
+                lines.append("")
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines) + "\n"
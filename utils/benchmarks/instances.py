@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Instance benchmark: creates many SpellCheckers on as many buffers and reports
+the construction time and the growth of the resident memory as JSON.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..", "..", "src")))
+
+_TEXT = "The quick brown fox jumps over the lazy dog, mispeled wrods included.\n"
+
+
+def resident_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # peak instead of current resident memory, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gtk", default="3.0", help="GTK version to use")
+    parser.add_argument("--language", default="en_US", help="spellchecking language")
+    parser.add_argument(
+        "--instances", type=int, default=500, help="number of instances"
+    )
+    parser.add_argument(
+        "--lines", type=int, default=20, help="lines of text per buffer"
+    )
+    arguments = parser.parse_args()
+
+    import gi
+
+    gi.require_version("Gtk", arguments.gtk)
+    from gi.repository import Gtk
+
+    from gtkspellcheck import SpellChecker
+
+    views = []
+    for _ in range(arguments.instances):
+        view = Gtk.TextView()
+        view.get_buffer().set_text(_TEXT * arguments.lines)
+        views.append(view)
+
+    # warm up, such that the dictionary and the language names are loaded
+    warmup = SpellChecker(Gtk.TextView(), arguments.language)
+
+    checkers = []
+    memory_before = resident_memory()
+    started = time.perf_counter()
+    for view in views:
+        checkers.append(SpellChecker(view, arguments.language))
+    elapsed = time.perf_counter() - started
+    memory_after = resident_memory()
+
+    print(
+        json.dumps(
+            {
+                "gtk": arguments.gtk,
+                "instances": arguments.instances,
+                "language": warmup.language,
+                "construction_ms": elapsed * 1000,
+                "construction_per_instance_ms": elapsed * 1000 / arguments.instances,
+                "resident_memory_bytes": memory_after,
+                "resident_memory_growth_bytes": memory_after - memory_before,
+                "resident_memory_per_instance_bytes": (memory_after - memory_before)
+                / arguments.instances,
+                "loaded_dictionaries": SpellChecker.dictionary_pool.loaded(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Startup benchmark: measures the time to import `gtkspellcheck`, to import the
+`SpellChecker` and to construct the first `SpellChecker`. Every sample runs in
+a fresh interpreter so nothing is cached between samples. The medians are
+printed as JSON and the exit status is 1 if any of them exceeds its budget.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from os.path import abspath, dirname, join
+
+_SOURCE = abspath(join(dirname(__file__), "..", "..", "src"))
+
+_SAMPLE = """
+import json
+import sys
+import time
+
+sys.path.insert(0, {source!r})
+
+import gi
+
+gi.require_version("Gtk", {gtk!r})
+from gi.repository import Gtk
+
+started = time.perf_counter()
+import gtkspellcheck
+
+package_imported = time.perf_counter()
+from gtkspellcheck import SpellChecker
+
+checker_imported = time.perf_counter()
+view = Gtk.TextView()
+view.get_buffer().set_text("The quick brown fox jumps over the lazy dog.")
+view_created = time.perf_counter()
+SpellChecker(view, {language!r})
+checker_created = time.perf_counter()
+
+print(
+    json.dumps(
+        {{
+            "import_package": (package_imported - started) * 1000,
+            "import_spellchecker": (checker_imported - package_imported) * 1000,
+            "first_spellchecker": (checker_created - view_created) * 1000,
+        }}
+    )
+)
+"""
+
+_MEASUREMENTS = ("import_package", "import_spellchecker", "first_spellchecker")
+
+
+def sample(gtk, language):
+    code = _SAMPLE.format(source=_SOURCE, gtk=gtk, language=language)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE
+    ).stdout
+    return json.loads(output.decode("utf-8").splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gtk", default="3.0", help="GTK version to use")
+    parser.add_argument("--language", default="en_US", help="spellchecking language")
+    parser.add_argument("--samples", type=int, default=10, help="number of samples")
+    for measurement in _MEASUREMENTS:
+        parser.add_argument(
+            "--budget-{}".format(measurement.replace("_", "-")),
+            type=float,
+            metavar="MS",
+            help="fail if the median of {} exceeds MS".format(measurement),
+        )
+    arguments = parser.parse_args()
+
+    samples = [
+        sample(arguments.gtk, arguments.language) for _ in range(arguments.samples)
+    ]
+    results = {"gtk": arguments.gtk, "samples": arguments.samples, "median_ms": {}}
+    exceeded = []
+    for measurement in _MEASUREMENTS:
+        values = [result[measurement] for result in samples]
+        median = statistics.median(values)
+        results["median_ms"][measurement] = median
+        results.setdefault("min_ms", {})[measurement] = min(values)
+        results.setdefault("max_ms", {})[measurement] = max(values)
+        budget = getattr(arguments, "budget_{}".format(measurement))
+        if budget is not None and median > budget:
+            exceeded.append(measurement)
+    results["exceeded"] = exceeded
+    print(json.dumps(results, indent=2))
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark suite measuring rechecks, typing, pasting, adding words and filters on
+generated documents. The views are never shown, a display is only needed for
+GTK to initialize, e.g., `xvfb-run` or `GDK_BACKEND=broadway`. The dictionary is
+generated from syllables and installed into a temporary Enchant configuration
+directory, such that results do not depend on the installed dictionaries. The
+results are printed as JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..", "..", "src")))
+sys.path.insert(0, abspath(dirname(__file__)))
+
+import corpus  # noqa: E402
+
+_LANGUAGE = "xx_XX"
+
+_BENCHMARKS = ("recheck", "keystroke", "paste", "add_to_dictionary", "filters")
+
+
+class Suite:
+    def __init__(self, arguments, words):
+        import gi
+
+        gi.require_version("Gtk", arguments.gtk)
+        from gi.repository import GLib, Gtk
+
+        from gtkspellcheck import SpellChecker
+
+        self.GLib = GLib
+        self.Gtk = Gtk
+        self.SpellChecker = SpellChecker
+        self.arguments = arguments
+        self.words = words
+        self.document = self.generate(arguments.size, arguments.seed)
+
+    def generate(self, size, seed):
+        return corpus.generate_document(
+            self.words,
+            size,
+            misspelling_rate=self.arguments.misspelling_rate,
+            url_rate=self.arguments.url_rate,
+            email_rate=self.arguments.email_rate,
+            line_length=self.arguments.line_length,
+            seed=seed,
+        )
+
+    def checker(self, text):
+        view = self.Gtk.TextView()
+        view.get_buffer().set_text(text)
+        checker = self.SpellChecker(view, _LANGUAGE)
+        # the spellchecker falls back to another language if the generated
+        # dictionary is not found, which would measure the wrong dictionary
+        assert checker.language == _LANGUAGE, "dictionary {} not found".format(
+            _LANGUAGE
+        )
+        self.drain()
+        return checker, view.get_buffer()
+
+    def drain(self):
+        # runs pending idle callbacks, e.g., batched rechecks and prefetching
+        context = self.GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+
+    def timed_recheck(self, checker):
+        started = time.perf_counter()
+        checker.recheck()
+        self.drain()
+        return time.perf_counter() - started
+
+    def recheck_results(self, checker, text):
+        self.SpellChecker.verdict_cache.clear()
+        self.SpellChecker.paragraph_cache.clear()
+        cold = self.timed_recheck(checker)
+        warm = [self.timed_recheck(checker) for _ in range(self.arguments.repeat)]
+        words = len(text.split())
+        return {
+            "cold_ms": cold * 1000,
+            "warm_ms": statistics.median(warm) * 1000,
+            "cold_words_per_second": words / cold,
+            "warm_words_per_second": words / statistics.median(warm),
+            "warm_chars_per_second": len(text) / statistics.median(warm),
+        }
+
+    def bench_recheck(self):
+        results = {}
+        for mode in ("iter", "bulk"):
+            checker, _buffer = self.checker(self.document)
+            checker.bulk_checking = mode == "bulk"
+            results[mode] = self.recheck_results(checker, self.document)
+        return results
+
+    def bench_keystroke(self):
+        _checker, buffer = self.checker(self.document)
+        offset = buffer.get_char_count() // 2
+        typed = " ".join(
+            self.words[index % len(self.words)]
+            for index in range(self.arguments.keystrokes)
+        )[: self.arguments.keystrokes]
+        latencies = []
+        for char in typed:
+            location = buffer.get_iter_at_offset(offset)
+            started = time.perf_counter()
+            buffer.insert(location, char)
+            latencies.append(time.perf_counter() - started)
+            offset += 1
+        self.drain()
+        latencies.sort()
+        return {
+            "keystrokes": len(latencies),
+            "median_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+
+    def bench_paste(self):
+        text = self.generate(self.arguments.paste_size, self.arguments.seed + 1)
+        durations = []
+        for _ in range(self.arguments.repeat):
+            _checker, buffer = self.checker(self.document)
+            location = buffer.get_iter_at_offset(buffer.get_char_count() // 2)
+            started = time.perf_counter()
+            buffer.insert(location, text)
+            self.drain()
+            durations.append(time.perf_counter() - started)
+        return {
+            "chars": len(text),
+            "median_ms": statistics.median(durations) * 1000,
+            "chars_per_second": len(text) / statistics.median(durations),
+        }
+
+    def bench_add_to_dictionary(self):
+        results = {}
+        for action in ("add_to_dictionary", "ignore_all"):
+            checker, _buffer = self.checker(self.document)
+            misspelled = dict.fromkeys(
+                word for _start, _end, word in checker.engine.check_text(self.document)
+            )
+            durations = []
+            for word in list(misspelled)[: self.arguments.repeat]:
+                started = time.perf_counter()
+                getattr(checker, action)(word)
+                self.drain()
+                durations.append(time.perf_counter() - started)
+            if durations:
+                results[action] = {
+                    "words": len(durations),
+                    "median_ms": statistics.median(durations) * 1000,
+                    "max_ms": max(durations) * 1000,
+                }
+        return results
+
+    def bench_filters(self):
+        word, line, text = (
+            self.SpellChecker.FILTER_WORD,
+            self.SpellChecker.FILTER_LINE,
+            self.SpellChecker.FILTER_TEXT,
+        )
+        defaults = self.SpellChecker.DEFAULT_FILTERS
+        configurations = {
+            "none": {},
+            "word": {word: defaults[word]},
+            "line": {line: defaults[line]},
+            # the line filters applied to the whole text
+            "text": {text: defaults[line]},
+        }
+        results = {}
+        for name, filters in configurations.items():
+            checker, _buffer = self.checker(self.document)
+            for filter_type, regexes in defaults.items():
+                for regex in regexes:
+                    checker.remove_filter(regex, filter_type)
+            for filter_type, regexes in filters.items():
+                for regex in regexes:
+                    checker.append_filter(regex, filter_type)
+            results[name] = self.recheck_results(checker, self.document)
+        return results
+
+    def run(self, benchmarks):
+        return {name: getattr(self, "bench_" + name)() for name in benchmarks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gtk", default="3.0", help="GTK version to use")
+    parser.add_argument("--size", type=int, default=50000, help="tokens per document")
+    parser.add_argument("--misspelling-rate", type=float, default=0.05)
+    parser.add_argument("--url-rate", type=float, default=0.01)
+    parser.add_argument("--email-rate", type=float, default=0.01)
+    parser.add_argument("--line-length", type=int, default=12, help="tokens per line")
+    parser.add_argument("--dictionary-size", type=int, default=5000)
+    parser.add_argument("--keystrokes", type=int, default=200)
+    parser.add_argument("--paste-size", type=int, default=20000, help="pasted tokens")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=_BENCHMARKS,
+        help="benchmark to run, may be given multiple times, defaults to all",
+    )
+    parser.add_argument("--output", help="write the results to this file")
+    arguments = parser.parse_args()
+
+    words = corpus.generate_words(arguments.dictionary_size, arguments.seed)
+    with tempfile.TemporaryDirectory(prefix="gtkspellcheck-benchmark-") as directory:
+        # Enchant reads the configuration directory when it is loaded, this
+        # happens lazily when the first SpellChecker is created
+        corpus.write_dictionary(directory, _LANGUAGE, words)
+        os.environ["ENCHANT_CONFIG_DIR"] = directory
+        suite = Suite(arguments, words)
+        results = {
+            "parameters": {
+                name: value
+                for name, value in vars(arguments).items()
+                if name != "output"
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "gtk": "{}.{}.{}".format(
+                    suite.Gtk.get_major_version(),
+                    suite.Gtk.get_minor_version(),
+                    suite.Gtk.get_micro_version(),
+                ),
+            },
+            "document": {
+                "chars": len(suite.document),
+                "lines": suite.document.count("\n"),
+            },
+            "results": suite.run(arguments.benchmark or _BENCHMARKS),
+        }
+
+    output = json.dumps(results, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
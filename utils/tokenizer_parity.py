@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# Copyright (C) 2012, Maximilian Köhl <linuxmaxi@googlemail.com>
+# Copyright (C) 2012, Carlos Jenkins <carlos@jenkins.co.cr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compares the words found by the RegexTokenizer with the words found by Pango,
+i.e., the PangoTokenizer, on hand-written samples and random texts. Prints the
+texts on which they differ and exits with status 1 if there are any.
+"""
+
+import argparse
+import random
+import sys
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..", "src")))
+
+_SAMPLES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Don't stop, it's the dogs' dinner.",
+    "'Tis the season, isn't it?",
+    "Quoted 'words' and ''doubled'' quotes.",
+    "Runs of '''''''''' apostrophes '''between''' words.",
+    "Numbers 42, 3.14 and 1,000 with words2gether.",
+    "Accents: café, naïve, Übergrößenträger, São Paulo.",
+    "Combining: café and naïve.",
+    "Hyphen-ated and slash/separated words, e-mail.",
+    "Line one\nline two\n\nparagraph three\ttabbed.",
+    "snake_case_identifier and __dunder__ names.",
+    "   leading and trailing whitespace   ",
+    "",
+]
+
+_ALPHABET = "abcdefgh ABC é'''  ,.-_\n1"
+
+
+def random_texts(count, length, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(_ALPHABET) for _ in range(length))
+
+
+def words(tokenizer, text):
+    return [text[start:end] for start, end in tokenizer.tokenize(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gtk", default="3.0", help="GTK version to use")
+    parser.add_argument("--extra-chars", default="'", help="extra characters")
+    parser.add_argument("--random", type=int, default=500, help="random texts")
+    parser.add_argument("--length", type=int, default=80, help="random text length")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    import gi
+
+    gi.require_version("Gtk", arguments.gtk)
+    from gi.repository import Gtk  # noqa: F401
+
+    from gtkspellcheck import PangoTokenizer, RegexTokenizer
+
+    pango = PangoTokenizer(arguments.extra_chars)
+    regex = RegexTokenizer(arguments.extra_chars)
+
+    texts = _SAMPLES + list(
+        random_texts(arguments.random, arguments.length, arguments.seed)
+    )
+    differences = 0
+    for text in texts:
+        expected = words(pango, text)
+        actual = words(regex, text)
+        if expected != actual:
+            differences += 1
+            print("text:  {!r}".format(text))
+            print("pango: {!r}".format(expected))
+            print("regex: {!r}".format(actual))
+            print()
+    print("{} of {} texts differ".format(differences, len(texts)))
+    return 1 if differences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())